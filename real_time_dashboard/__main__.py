@@ -0,0 +1,80 @@
+"""
+Command-line entry point:
+
+    python -m real_time_dashboard --port 8050
+    python -m real_time_dashboard --workers 4 --refresh stock=30 --refresh news=600
+
+Flags are turned into the DASHBOARD_* environment variables read by
+config.py and gunicorn.conf.py. With one worker the app runs on Flask's
+threaded server. With more, it is handed to gunicorn, and the workers
+share a SQLite fetch cache unless --cache-url says otherwise.
+"""
+
+import argparse
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m real_time_dashboard", description="Real-Time Global Insights Dashboard")
+    parser.add_argument("--host", default="127.0.0.1", help="address to bind (default: %(default)s)")
+    parser.add_argument("--port", type=int, default=8050, help="port to bind (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes; more than 1 runs gunicorn (default: %(default)s)")
+    parser.add_argument("--threads", type=int, help="threads per gunicorn worker")
+    parser.add_argument("--push-streams", type=int, help="/_push streams per worker before tabs fall back to polling")
+    parser.add_argument("--production", action="store_true", help="debug off, compressed responses, cached assets")
+    parser.add_argument("--refresh", action="append", default=[], metavar="SOURCE=SECONDS",
+                        help="refresh period for one source (stock, covid, weather, crypto, news, marketcap); repeatable")
+    parser.add_argument("--cache-url", help="fetch cache backend: memory://, sqlite:///path or redis://host:port/db")
+    parser.add_argument("--cache-size", type=int, help="entries kept by the fetch cache")
+    parser.add_argument("--stock-tickers", type=int, help="tickers whose intraday bars are kept in memory")
+    parser.add_argument("--ticker", help="default stock watchlist (e.g. 'AAPL, MSFT')")
+    parser.add_argument("--country", help="default COVID-19 country")
+    parser.add_argument("--city", help="default weather city")
+    return parser.parse_args(argv)
+
+
+def apply_settings(args, environ=os.environ):
+    """Export the parsed flags as DASHBOARD_* variables for config.py"""
+    settings = {
+        "DASHBOARD_BIND": f"{args.host}:{args.port}",
+        "DASHBOARD_WORKERS": args.workers,
+        "DASHBOARD_THREADS": args.threads,
+        "DASHBOARD_PUSH_STREAMS": args.push_streams,
+        "DASHBOARD_REFRESH": ",".join(args.refresh) or None,
+        "DASHBOARD_CACHE_URL": args.cache_url,
+        "DASHBOARD_CACHE_SIZE": args.cache_size,
+        "DASHBOARD_STOCK_TICKERS": args.stock_tickers,
+        "DASHBOARD_TICKER": args.ticker,
+        "DASHBOARD_COUNTRY": args.country,
+        "DASHBOARD_CITY": args.city,
+        "DASHBOARD_ENV": "production" if args.production else None,
+    }
+    for name, value in settings.items():
+        if value is not None:
+            environ[name] = str(value)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    apply_settings(args)
+    # Fail on bad settings here rather than in every worker
+    try:
+        import config  # noqa: F401
+    except ValueError as exc:
+        sys.exit(f"error: {exc}")
+
+    if args.workers > 1:
+        conf = os.path.join(HERE, "gunicorn.conf.py")
+        os.execv(sys.executable, [sys.executable, "-m", "gunicorn", "--chdir", HERE, "-c", conf, "wsgi:server"])
+
+    from app import app, PRODUCTION
+    app.run(host=args.host, port=args.port, debug=not PRODUCTION)
+
+
+if __name__ == "__main__":
+    # The dashboard's modules import each other as top-level modules
+    sys.path.insert(0, HERE)
+    main()
@@ -14,78 +14,266 @@ Built with Dash 3+, Plotly, and Public APIs.
 Author: Nitika Niti
 """
 
-import requests
+import json
+import math
+import os
+import time
+from datetime import datetime
+
 import pandas as pd
-import yfinance as yf
-from dash import Dash, dcc, html, Input, Output, State
+from dash import Dash, dcc, html, Input, Output, State, Patch, ctx, no_update
 import plotly.express as px
 import plotly.graph_objects as go
 
+from bars import BarStore, parse_watchlist
+from breaker import BREAKERS, OPEN, register_breakers
+from budget import BUDGET, register_budget
+from cache import cached, fingerprint, set_backend
+from config import (CACHE_SIZE, CACHE_URL, DEFAULT_CITY, DEFAULT_COUNTRY, DEFAULT_TICKER, PRODUCTION,
+                    PUSH_STREAMS, REFRESH_SECONDS, STATE_DIR, STOCK_TICKERS, UPSTREAMS)
+from geocode import GeocodeCache
+from http_client import HTTP
+from marketcaps import MarketCapFeed, load_universe
+from metrics import METRICS, register_metrics, timed_callback
+from poller import Poller
+from production import configure_production
+from push import register_push
+from shared_cache import cache_from_url
+from snapshots import SnapshotStore
+from timeseries import SeriesStore
+
+# Deployment settings (refresh periods, cache size, default inputs,
+# production mode) come from config.py; see __main__.py for the CLI.
+# REFRESH_SECONDS is shared by the dcc.Interval timers and the fetch cache,
+# so N viewers cost one upstream call per source per window.
+
+# With server push on, cards update when the server's data changes; the
+# dcc.Interval timers only tick every KEEPALIVE_WINDOWS refresh periods to
+# keep the viewer's inputs watched (and take over if the stream fails).
+PUSH_UPDATES = True
+KEEPALIVE_WINDOWS = 10
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# Fetch cache backend. Point every gunicorn worker at the same sqlite:/// or
+# redis:// URL so they share one upstream fetch per source per refresh window.
+set_backend(cache_from_url(CACHE_URL, maxsize=CACHE_SIZE))
+
+# City coordinates never change; persisted so restarts don't re-geocode.
+GEOCODES = GeocodeCache(os.path.join(STATE_DIR, "geocode.json"))
+
+# Intraday bars per ticker; each refresh only downloads the newest bars.
+STOCK_BARS = BarStore(max_tickers=STOCK_TICKERS)
+
+# Market-cap universe (CSV) and how many of its leaders the card shows.
+MARKETCAP_UNIVERSE = os.path.join(DATA_DIR, "marketcap_universe.csv")
+MARKETCAP_TOP_N = 10
+MARKET_CAPS = MarketCapFeed(*load_universe(MARKETCAP_UNIVERSE))
+
+# Coins tracked: an explicit list of CoinGecko ids, or (if None) the top
+# CRYPTO_UNIVERSE coins by market cap. The card plots the CRYPTO_TOP_K largest.
+CRYPTO_IDS = None
+CRYPTO_UNIVERSE = 250
+CRYPTO_TOP_K = 10
+COINGECKO_PAGE_SIZE = 250  # per_page maximum of /coins/markets
+CRYPTO_COLUMNS = ["id", "symbol", "name", "current_price", "market_cap", "market_cap_rank",
+                  "total_volume", "price_change_percentage_24h", "last_updated"]
+
+# Every crypto sample is kept in fixed-size ring buffers (one per coin) so the
+# card can chart the last CRYPTO_HISTORY_HOURS without extra API calls.
+CRYPTO_HISTORY_HOURS = 24
+# The history chart plots one point per bucket (the last sample in it), so
+# its size doesn't grow with the number of samples kept.
+CRYPTO_HISTORY_BUCKET = 15 * 60
+CRYPTO_HISTORY = SeriesStore(capacity=CRYPTO_HISTORY_HOURS * 3600 // REFRESH_SECONDS["crypto"])
+
 # ---------------------- Helper Functions ---------------------- #
 
-def fetch_stock_data(ticker):
-    """Fetch live stock data from Yahoo Finance"""
+@cached("stock", ttl=REFRESH_SECONDS["stock"])
+def fetch_stock_data(watchlist):
+    """Fetch live prices for a comma-separated watchlist from Yahoo Finance.
+
+    Returns one wide frame: a Datetime column plus a Close column per ticker.
+    """
     try:
-        tk = yf.Ticker(ticker)
-        df = tk.history(period="1d", interval="5m")
-        df = df.reset_index()
+        tickers = parse_watchlist(watchlist)
+        STOCK_BARS.update(tickers)
+        df = STOCK_BARS.session(tickers).reset_index()
         return df
     except Exception:
         return pd.DataFrame()
 
+@cached("covid", ttl=REFRESH_SECONDS["covid"])
 def fetch_covid_data(country):
     """Fetch COVID-19 stats by country"""
     try:
-        url = f"https://disease.sh/v3/covid-19/countries/{country}?strict=true"
-        data = requests.get(url).json()
+        url = f"{UPSTREAMS['disease']}/covid-19/countries/{country}?strict=true"
+        data = HTTP.get_json(url)
         return data
     except Exception:
         return None
 
+def geocode_city(city):
+    """Look up a city's coordinates with the Open-Meteo geocoding API"""
+    geo = HTTP.get_json(f"{UPSTREAMS['geocoding']}/search", params={"name": city, "count": 1})
+    return geo["results"][0]["latitude"], geo["results"][0]["longitude"]
+
+@cached("weather", ttl=REFRESH_SECONDS["weather"])
 def fetch_weather(city):
     """Fetch live weather info by city"""
     try:
-        geo = requests.get(f"https://geocoding-api.open-meteo.com/v1/search?name={city}&count=1").json()
-        lat = geo["results"][0]["latitude"]
-        lon = geo["results"][0]["longitude"]
-        weather = requests.get(
-            f"https://api.open-meteo.com/v1/forecast?latitude={lat}&longitude={lon}&current_weather=true"
-        ).json()
+        lat, lon = GEOCODES.resolve(city, geocode_city)
+        weather = HTTP.get_json(
+            f"{UPSTREAMS['forecast']}/forecast",
+            params={"latitude": lat, "longitude": lon, "current_weather": "true"},
+        )
         return weather["current_weather"]
     except Exception:
         return None
 
+def crypto_pages(ids=None, universe=CRYPTO_UNIVERSE, page_size=COINGECKO_PAGE_SIZE):
+    """Query params for the fewest /coins/markets calls that cover the coin universe"""
+    base = {"vs_currency": "usd", "order": "market_cap_desc", "per_page": page_size}
+    if ids:
+        for start in range(0, len(ids), page_size):
+            yield {**base, "ids": ",".join(ids[start:start + page_size]), "page": 1}
+    else:
+        for page in range(1, math.ceil(universe / page_size) + 1):
+            yield {**base, "page": page}
+
+@cached("crypto", ttl=REFRESH_SECONDS["crypto"])
 def fetch_crypto_data():
-    """Fetch top crypto prices"""
-    try:
-        url = "https://api.coingecko.com/api/v3/coins/markets"
-        params = {"vs_currency": "usd", "ids": "bitcoin,ethereum,solana,dogecoin"}
-        data = requests.get(url, params=params).json()
-        return pd.DataFrame(data)
-    except Exception:
+    """Fetch crypto market data for the configured coin universe, largest first.
+
+    Pages are fetched one after another to stay inside CoinGecko's rate
+    limit; if a later page fails, the coins already fetched are kept.
+    """
+    url = f"{UPSTREAMS['coingecko']}/coins/markets"
+    frames = []
+    for params in crypto_pages(CRYPTO_IDS, CRYPTO_UNIVERSE):
+        try:
+            data = HTTP.get_json(url, params=params)
+        except Exception:
+            break
+        if not data:
+            break
+        frames.append(pd.DataFrame(data).reindex(columns=CRYPTO_COLUMNS))
+    if not frames:
         return pd.DataFrame()
+    df = pd.concat(frames, ignore_index=True).drop_duplicates("id")
+    df = df.sort_values("market_cap", ascending=False, ignore_index=True)
+    return df if CRYPTO_IDS else df.head(CRYPTO_UNIVERSE)
 
+@cached("marketcap", ttl=REFRESH_SECONDS["marketcap"])
 def fetch_market_caps():
-    """Static global market caps for big tech companies"""
-    companies = {
-        "Apple": 3.1, "Microsoft": 2.8, "Amazon": 1.9, "Google": 2.0,
-        "NVIDIA": 2.3, "Meta": 1.3, "Tesla": 0.9, "Samsung": 0.6
-    }
-    df = pd.DataFrame(list(companies.items()), columns=["Company", "MarketCap"])
-    return df.sort_values("MarketCap", ascending=False)
+    """Fetch live market caps for the universe and return the current leaders"""
+    try:
+        MARKET_CAPS.refresh()
+    except Exception:
+        pass
+    return MARKET_CAPS.top(MARKETCAP_TOP_N)
 
+@cached("news", ttl=REFRESH_SECONDS["news"])
 def fetch_tech_news():
     """Fetch latest tech news headlines"""
     try:
-        url = "https://hn.algolia.com/api/v1/search?query=technology&tags=story&hitsPerPage=5"
-        data = requests.get(url).json()
+        url = f"{UPSTREAMS['hn']}/search"
+        params = {"query": "technology", "tags": "story", "hitsPerPage": 5}
+        data = HTTP.get_json(url, params=params)
         return [(item["title"], item["url"]) for item in data["hits"]]
     except Exception:
         return []
 
+def build_marketcap_figure(df):
+    """Bar chart of company market caps"""
+    fig = px.bar(df, x="Company", y="MarketCap", color="Company", template="plotly_dark")
+    fig.update_traces(marker_line_color="#00ffff", marker_line_width=1.5)
+    return fig
+
+# Placeholder built once from the universe CSV's seed caps and embedded in the
+# layout, so the card isn't blank; update_marketcap replaces it with the live
+# snapshot as soon as each page loads.
+MARKETCAP_FIGURE = build_marketcap_figure(MARKET_CAPS.top(MARKETCAP_TOP_N))
+
+# ---------------------- Background Poller ---------------------- #
+
+# Callbacks only read snapshots from the poller; the network is hit from its
+# background threads on each source's own cadence.
+# Changed snapshots are persisted (with a bounded history per source) and
+# loaded back at start-up, so a restart doesn't begin cold. The crypto
+# history is persisted as (coin, time, price) samples, not whole frames, and
+# only at the chart's resolution: the latest sample per coin and bucket.
+SNAPSHOTS = SnapshotStore(os.path.join(STATE_DIR, "snapshots.sqlite3"))
+
+def record_crypto_history(df):
+    """Append a new crypto snapshot to the ring buffers and persist the new samples"""
+    added = CRYPTO_HISTORY.append_frame(df)
+    if added:
+        SNAPSHOTS.add_samples("crypto", added, since=time.time() - CRYPTO_HISTORY_HOURS * 3600,
+                              resolution=CRYPTO_HISTORY_BUCKET)
+
+POLLER = Poller(idle_windows=KEEPALIVE_WINDOWS + 2 if PUSH_UPDATES else 3, store=SNAPSHOTS)
+# Pinned under the normalised watchlist update_stock asks for ("aapl,msft" -> "AAPL, MSFT")
+POLLER.register("stock", fetch_stock_data, REFRESH_SECONDS["stock"],
+                defaults=[(", ".join(parse_watchlist(DEFAULT_TICKER)),)])
+POLLER.register("covid", fetch_covid_data, REFRESH_SECONDS["covid"], defaults=[(DEFAULT_COUNTRY,)])
+POLLER.register("weather", fetch_weather, REFRESH_SECONDS["weather"], defaults=[(DEFAULT_CITY,)])
+# The price history is fed from the poller, not from fetch_crypto_data: with a
+# shared cache only one worker runs the fetch, but every worker sees the change.
+POLLER.register("crypto", fetch_crypto_data, REFRESH_SECONDS["crypto"], on_change=record_crypto_history)
+POLLER.register("news", fetch_tech_news, REFRESH_SECONDS["news"])
+POLLER.register("marketcap", fetch_market_caps, REFRESH_SECONDS["marketcap"])
+
+def restore_from_disk():
+    """Warm the poller and the crypto history from the snapshot store"""
+    POLLER.restore()
+    for key, t, value in SNAPSHOTS.samples("crypto", since=time.time() - CRYPTO_HISTORY_HOURS * 3600):
+        CRYPTO_HISTORY.append(key, t, value)
+
+restore_from_disk()
+
+def as_of(snapshot):
+    """'as of HH:MM:SS' label telling viewers how old a card's data is"""
+    label = f"as of {datetime.fromtimestamp(snapshot.fetched_at):%H:%M:%S}"
+    return f"{label} · refreshing…" if snapshot.stale else label
+
 # ---------------------- App Setup ---------------------- #
 
-app = Dash(__name__, title="🌐 Real-Time Dashboard", suppress_callback_exceptions=True)
+app = Dash(__name__, title="🌐 Real-Time Dashboard", suppress_callback_exceptions=True, serve_locally=True)
+
+if PRODUCTION:
+    configure_production(app.server)
+
+# Prometheus metrics on /metrics; registered first so callback requests are
+# timed from the start.
+register_metrics(app.server)
+METRICS.gauge("dashboard_budget_remaining", "Upstream request tokens left", ["host"],
+              lambda: {(host,): b["remaining"] for host, b in BUDGET.remaining().items()})
+METRICS.gauge("dashboard_circuit_open", "1 while an upstream's circuit breaker is open", ["host"],
+              lambda: {(host,): int(b["state"] == OPEN) for host, b in BREAKERS.states().items()})
+
+# Start polling in the process that actually serves requests (not in the
+# reloader parent, and after gunicorn has forked its workers).
+app.server.before_request(POLLER.start)
+
+if PUSH_UPDATES:
+    register_push(app.server, POLLER, max_streams=PUSH_STREAMS)
+
+# Remaining upstream request budget and circuit-breaker state per host.
+register_budget(app.server)
+register_breakers(app.server)
+
+def interval_ms(source):
+    """dcc.Interval period for a source: its refresh period, or the keep-alive under push"""
+    return REFRESH_SECONDS[source] * 1000 * (KEEPALIVE_WINDOWS if PUSH_UPDATES else 1)
+
+def push_stores():
+    """Stores bumped by assets/push.js; each one triggers its card's callback"""
+    intervals = {source: seconds * 1000 for source, seconds in REFRESH_SECONDS.items()}
+    config = {"data-enabled": json.dumps(PUSH_UPDATES), "data-intervals": json.dumps(intervals)}
+    return [dcc.Store(id=f"push-{source}") for source in REFRESH_SECONDS] + [
+        html.Div(id="push-config", hidden=True, **config)
+    ]
 
 app.layout = html.Div(className="main-container", children=[
 
@@ -96,156 +284,275 @@ app.layout = html.Div(className="main-container", children=[
     html.Div(className="card glass", children=[
         html.H2("📈 Live Stock Prices", className="card-title"),
         html.Div(className="input-row", children=[
-            dcc.Input(id="stock-ticker", type="text", value="AAPL", placeholder="Enter Stock Symbol", className="input-box"),
+            dcc.Input(id="stock-ticker", type="text", value=DEFAULT_TICKER, placeholder="Enter Stock Symbols (AAPL, MSFT, ...)", className="input-box"),
             html.Button("Load", id="load-stock", className="button"),
         ]),
-        dcc.Loading(dcc.Graph(id="stock-graph"), type="circle", color="#00ffff"),
+        dcc.Loading(dcc.Graph(id="stock-graph"), type="circle", color="#00ffff", delay_show=500),
         html.Div(id="stock-info", className="info-text"),
-        dcc.Interval(id="stock-interval", interval=60000, n_intervals=0)
+        html.Div(id="stock-asof", className="as-of"),
+        dcc.Store(id="stock-rendered"),
+        dcc.Interval(id="stock-interval", interval=interval_ms("stock"), n_intervals=0)
     ]),
 
     # COVID Section
     html.Div(className="card glass", children=[
         html.H2("🦠 COVID-19 Stats", className="card-title"),
         html.Div(className="input-row", children=[
-            dcc.Input(id="country", type="text", value="India", placeholder="Enter Country", className="input-box"),
+            dcc.Input(id="country", type="text", value=DEFAULT_COUNTRY, placeholder="Enter Country", className="input-box"),
             html.Button("Fetch", id="load-covid", className="button"),
         ]),
-        dcc.Loading(html.Div(id="covid-info", className="info-text"), type="circle", color="#00ffff"),
-        dcc.Interval(id="covid-interval", interval=120000, n_intervals=0)
+        dcc.Loading(html.Div(id="covid-info", className="info-text"), type="circle", color="#00ffff", delay_show=500),
+        html.Div(id="covid-asof", className="as-of"),
+        dcc.Interval(id="covid-interval", interval=interval_ms("covid"), n_intervals=0)
     ]),
 
     # Weather Section
     html.Div(className="card glass", children=[
         html.H2("🌤 Weather Updates", className="card-title"),
         html.Div(className="input-row", children=[
-            dcc.Input(id="city", type="text", value="New Delhi", placeholder="Enter City", className="input-box"),
+            dcc.Input(id="city", type="text", value=DEFAULT_CITY, placeholder="Enter City", className="input-box"),
             html.Button("Check", id="load-weather", className="button"),
         ]),
-        dcc.Loading(html.Div(id="weather-info", className="info-text"), type="circle", color="#00ffff"),
-        dcc.Interval(id="weather-interval", interval=180000, n_intervals=0)
+        dcc.Loading(html.Div(id="weather-info", className="info-text"), type="circle", color="#00ffff", delay_show=500),
+        html.Div(id="weather-asof", className="as-of"),
+        dcc.Interval(id="weather-interval", interval=interval_ms("weather"), n_intervals=0)
     ]),
 
     # Crypto Section
     html.Div(className="card glass", children=[
         html.H2("💰 Cryptocurrency Tracker", className="card-title"),
-        dcc.Loading(dcc.Graph(id="crypto-graph"), type="circle", color="#00ffff"),
-        dcc.Interval(id="crypto-interval", interval=60000, n_intervals=0)
+        dcc.Loading(dcc.Graph(id="crypto-graph"), type="circle", color="#00ffff", delay_show=500),
+        dcc.Graph(id="crypto-history-graph"),
+        html.Div(id="crypto-asof", className="as-of"),
+        dcc.Store(id="crypto-fingerprint"),
+        dcc.Interval(id="crypto-interval", interval=interval_ms("crypto"), n_intervals=0)
     ]),
 
     # Market Cap Section
     html.Div(className="card glass", children=[
-        html.H2("🏦 Global Tech Company Market Caps (Trillions USD)", className="card-title"),
-        dcc.Graph(id="marketcap-graph"),
+        html.H2("🏦 Global Market Leaders (Trillions USD)", className="card-title"),
+        dcc.Graph(id="marketcap-graph", figure=MARKETCAP_FIGURE),
+        html.Div(id="marketcap-asof", className="as-of"),
+        dcc.Store(id="marketcap-fingerprint"),
+        dcc.Interval(id="marketcap-interval", interval=interval_ms("marketcap"), n_intervals=0)
     ]),
 
     # News Feed
     html.Div(className="card glass", children=[
         html.H2("📰 Latest Tech News", className="card-title"),
         html.Div(id="news-feed", className="news-section"),
-        dcc.Interval(id="news-interval", interval=300000, n_intervals=0)
+        html.Div(id="news-asof", className="as-of"),
+        dcc.Store(id="news-fingerprint"),
+        dcc.Interval(id="news-interval", interval=interval_ms("news"), n_intervals=0)
     ]),
 
-    html.Footer("© 2025 Real-Time Dashboard by Nitika Niti", className="footer")
+    html.Footer("© 2025 Real-Time Dashboard by Nitika Niti", className="footer"),
+    *push_stores(),
 ])
 
 # ---------------------- Callbacks ---------------------- #
 
+def build_crypto_figure(coins):
+    """Bar chart of the given coins' prices"""
+    fig = px.bar(coins, x="name", y="current_price", color="name",
+                 title="Top Cryptos (USD)", text="current_price", template="plotly_dark")
+    fig.update_traces(texttemplate="$%{text}", textposition="outside")
+    fig.update_layout(margin=dict(l=20, r=20, t=40, b=20))
+    return fig
+
+def build_crypto_history_figure(coins):
+    """Price change (%) of the given coins over the recorded history window"""
+    since = datetime.now().timestamp() - CRYPTO_HISTORY_HOURS * 3600
+    hist = CRYPTO_HISTORY.frame(coins["id"], since=since, bucket=CRYPTO_HISTORY_BUCKET)
+    hist["change"] = hist.groupby("key")["value"].transform(lambda v: (v / v.iloc[0] - 1) * 100)
+    hist["name"] = hist["key"].map(dict(zip(coins["id"], coins["name"])))
+    fig = px.line(hist, x="time", y="change", color="name", template="plotly_dark",
+                  title=f"Price Change over the Last {CRYPTO_HISTORY_HOURS}h (%)")
+    fig.update_layout(margin=dict(l=20, r=20, t=40, b=20), yaxis_title="%", xaxis_title="", legend_title_text="")
+    return fig
+
+def build_stock_figure(df, tickers, watchlist):
+    """Line chart of the watchlist's prices, as a figure dict"""
+    fig = px.line(df, x="Datetime", y=tickers, title=f"{watchlist} Live Price", template="plotly_dark", markers=True)
+    fig.update_layout(margin=dict(l=20, r=20, t=40, b=20), yaxis_title="Price", legend_title_text="")
+    # Ship plain arrays, not base64 typed arrays, so later Patches can index into them
+    fig = fig.to_dict()
+    for trace in fig["data"]:
+        trace["x"] = df["Datetime"].tolist()
+        trace["y"] = df[trace["name"]].tolist()
+    return fig
+
+def patch_stock_figure(df, tickers, rendered):
+    """Patch that brings the chart described by rendered up to date with df.
+
+    Only the still-forming last bar is overwritten and newer bars appended,
+    so a tick ships a few hundred bytes instead of the whole figure. Returns
+    None when the chart has to be rebuilt (new watchlist, new session, ...).
+    """
+    length = rendered.get("length", 0)
+    if rendered.get("tickers") != tickers or not 0 < length <= len(df):
+        return None
+    if df["Datetime"].iloc[length - 1] != pd.Timestamp(rendered["last"]):
+        return None
+    fresh = df.iloc[length - 1:]
+    if len(fresh) == 1 and rendered.get("close") == fresh[tickers].iloc[0].tolist():
+        return no_update
+    patched = Patch()
+    for i, t in enumerate(tickers):
+        patched["data"][i]["y"][length - 1] = fresh[t].iloc[0]
+        if len(fresh) > 1:
+            patched["data"][i]["x"].extend(fresh["Datetime"].iloc[1:].tolist())
+            patched["data"][i]["y"].extend(fresh[t].iloc[1:].tolist())
+    return patched
+
 @app.callback(
     Output("stock-graph", "figure"),
     Output("stock-info", "children"),
+    Output("stock-asof", "children"),
+    Output("stock-rendered", "data"),
     Input("load-stock", "n_clicks"),
     Input("stock-interval", "n_intervals"),
+    Input("push-stock", "data"),
     State("stock-ticker", "value"),
+    State("stock-rendered", "data"),
     prevent_initial_call=False
 )
-def update_stock(n_clicks, n_intervals, ticker):
-    df = fetch_stock_data(ticker)
+@timed_callback("stock")
+def update_stock(n_clicks, n_intervals, pushed, ticker, rendered):
+    watchlist = ", ".join(parse_watchlist(ticker))
+    if not watchlist:
+        fig = go.Figure()
+        fig.update_layout(title="No Stock Data Found", template="plotly_dark")
+        return fig, f"No data for {ticker}", "", None
+    snap = POLLER.snapshot("stock", watchlist)
+    df = snap.value
     if df.empty:
         fig = go.Figure()
         fig.update_layout(title="No Stock Data Found", template="plotly_dark")
-        return fig, f"No data for {ticker}"
-    fig = px.line(df, x="Datetime", y="Close", title=f"{ticker} Live Price", template="plotly_dark", markers=True)
-    fig.update_layout(margin=dict(l=20, r=20, t=40, b=20))
+        return fig, f"No data for {ticker}", as_of(snap), None
+    tickers = [c for c in df.columns if c != "Datetime"]
     latest = df.iloc[-1]
-    return fig, f"Last Updated: {latest['Datetime']} | Price: ${latest['Close']:.2f}"
+    state = {"tickers": tickers, "length": len(df), "last": latest["Datetime"].isoformat(),
+             "close": latest[tickers].tolist()}
+    fig = None
+    if rendered and ctx.triggered_id != "load-stock":
+        fig = patch_stock_figure(df, tickers, rendered)
+    if fig is None:
+        fig = build_stock_figure(df, tickers, watchlist)
+    prices = " | ".join(f"{t}: ${df[t].dropna().iloc[-1]:.2f}" for t in tickers)
+    return fig, f"Last Updated: {latest['Datetime']} | {prices}", as_of(snap), state
 
 @app.callback(
     Output("covid-info", "children"),
+    Output("covid-asof", "children"),
     Input("load-covid", "n_clicks"),
     Input("covid-interval", "n_intervals"),
+    Input("push-covid", "data"),
     State("country", "value"),
     prevent_initial_call=False
 )
-def update_covid(n_clicks, n_intervals, country):
-    data = fetch_covid_data(country)
+@timed_callback("covid")
+def update_covid(n_clicks, n_intervals, pushed, country):
+    snap = POLLER.snapshot("covid", country)
+    data = snap.value
     if not data:
-        return html.P("⚠️ No data available.", className="warning")
+        return html.P("⚠️ No data available.", className="warning"), as_of(snap)
     return html.Div([
         html.P(f"Country: {data['country']}"),
         html.P(f"Cases: {data['cases']:,}"),
         html.P(f"Active: {data['active']:,}"),
         html.P(f"Recovered: {data['recovered']:,}"),
         html.P(f"Deaths: {data['deaths']:,}")
-    ])
+    ]), as_of(snap)
 
 @app.callback(
     Output("weather-info", "children"),
+    Output("weather-asof", "children"),
     Input("load-weather", "n_clicks"),
     Input("weather-interval", "n_intervals"),
+    Input("push-weather", "data"),
     State("city", "value"),
     prevent_initial_call=False
 )
-def update_weather(n_clicks, n_intervals, city):
-    data = fetch_weather(city)
+@timed_callback("weather")
+def update_weather(n_clicks, n_intervals, pushed, city):
+    snap = POLLER.snapshot("weather", city)
+    data = snap.value
     if not data:
-        return html.P("⚠️ No weather data available.", className="warning")
+        return html.P("⚠️ No weather data available.", className="warning"), as_of(snap)
     return html.Div([
         html.P(f"Temperature: {data['temperature']}°C"),
         html.P(f"Windspeed: {data['windspeed']} m/s"),
         html.P(f"Time: {data['time']}")
-    ])
+    ]), as_of(snap)
+
+# The crypto, market-cap and news callbacks keep a fingerprint of the data they last
+# rendered in a per-tab dcc.Store and send no_update when it hasn't changed,
+# so identical payloads are neither re-serialised nor re-laid-out.
 
 @app.callback(
     Output("crypto-graph", "figure"),
+    Output("crypto-history-graph", "figure"),
+    Output("crypto-asof", "children"),
+    Output("crypto-fingerprint", "data"),
     Input("crypto-interval", "n_intervals"),
+    Input("push-crypto", "data"),
+    State("crypto-fingerprint", "data"),
     prevent_initial_call=False
 )
-def update_crypto(n):
-    df = fetch_crypto_data()
-    if df.empty:
-        return go.Figure()
-    fig = px.bar(df, x="name", y="current_price", color="name",
-                 title="Top Cryptos (USD)", text="current_price", template="plotly_dark")
-    fig.update_traces(texttemplate="$%{text}", textposition="outside")
-    fig.update_layout(margin=dict(l=20, r=20, t=40, b=20))
-    return fig
+@timed_callback("crypto")
+def update_crypto(n, pushed, rendered):
+    snap = POLLER.snapshot("crypto")
+    if snap.value.empty:
+        return go.Figure(), go.Figure(), as_of(snap), None
+    df = snap.value.nlargest(CRYPTO_TOP_K, "market_cap")
+    digest = fingerprint(df[["name", "current_price", "last_updated"]])
+    if digest == rendered:
+        return no_update, no_update, as_of(snap), no_update
+    return build_crypto_figure(df), build_crypto_history_figure(df), as_of(snap), digest
 
 @app.callback(
     Output("marketcap-graph", "figure"),
-    Input("crypto-interval", "n_intervals")
+    Output("marketcap-asof", "children"),
+    Output("marketcap-fingerprint", "data"),
+    Input("marketcap-interval", "n_intervals"),
+    Input("push-marketcap", "data"),
+    State("marketcap-fingerprint", "data"),
+    prevent_initial_call=False
 )
-def update_marketcap(n):
-    df = fetch_market_caps()
-    fig = px.bar(df, x="Company", y="MarketCap", color="Company", template="plotly_dark")
-    fig.update_traces(marker_line_color="#00ffff", marker_line_width=1.5)
-    return fig
+@timed_callback("marketcap")
+def update_marketcap(n, pushed, rendered):
+    snap = POLLER.snapshot("marketcap")
+    df = snap.value
+    digest = fingerprint(df)
+    if df.empty or digest == rendered:
+        return no_update, as_of(snap), no_update
+    return build_marketcap_figure(df), as_of(snap), digest
 
 @app.callback(
     Output("news-feed", "children"),
+    Output("news-asof", "children"),
+    Output("news-fingerprint", "data"),
     Input("news-interval", "n_intervals"),
+    Input("push-news", "data"),
+    State("news-fingerprint", "data"),
     prevent_initial_call=False
 )
-def update_news(n):
-    news = fetch_tech_news()
+@timed_callback("news")
+def update_news(n, pushed, rendered):
+    snap = POLLER.snapshot("news")
+    news = snap.value
     if not news:
-        return html.P("⚠️ No latest news available.", className="warning")
+        return html.P("⚠️ No latest news available.", className="warning"), as_of(snap), None
+    digest = fingerprint(news)
+    if digest == rendered:
+        return no_update, as_of(snap), no_update
     return [
         html.Div(className="news-item", children=[
             html.A(title, href=link, target="_blank", className="news-link")
         ]) for title, link in news
-    ]
+    ], as_of(snap), digest
 
 # ---------------------- Run Server ---------------------- #
 if __name__ == "__main__":
-    app.run(debug=True)
+    app.run(debug=not PRODUCTION)
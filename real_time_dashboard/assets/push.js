@@ -0,0 +1,52 @@
+/* ====== 🔔 Server push: refresh a card only when its data changed ====== */
+
+(function () {
+  if (!window.EventSource) {
+    return;
+  }
+
+  function readConfig() {
+    var el = document.getElementById("push-config");
+    if (!el) {
+      return null;
+    }
+    return {enabled: JSON.parse(el.dataset.enabled), intervals: JSON.parse(el.dataset.intervals)};
+  }
+
+  function prefix() {
+    var el = document.getElementById("_dash-config");
+    var cfg = el ? JSON.parse(el.textContent) : {};
+    return cfg.requests_pathname_prefix || "/";
+  }
+
+  // If the stream can't be opened at all (or the server answers 503 because
+  // the worker is at its stream limit), fall back to normal polling
+  function fallBackToPolling(intervals) {
+    Object.keys(intervals).forEach(function (source) {
+      window.dash_clientside.set_props(source + "-interval", {interval: intervals[source]});
+    });
+  }
+
+  function connect() {
+    var config = readConfig();
+    if (!config || !window.dash_clientside || !window.dash_clientside.set_props) {
+      // Layout not rendered yet
+      return setTimeout(connect, 250);
+    }
+    if (!config.enabled) {
+      return;
+    }
+    var stream = new EventSource(prefix() + "_push");
+    stream.onmessage = function (event) {
+      var msg = JSON.parse(event.data);
+      window.dash_clientside.set_props("push-" + msg.source, {data: msg.version});
+    };
+    stream.onerror = function () {
+      if (stream.readyState === EventSource.CLOSED) {
+        fallBackToPolling(config.intervals);
+      }
+    };
+  }
+
+  document.addEventListener("DOMContentLoaded", connect);
+})();
@@ -0,0 +1,103 @@
+"""
+Incremental intraday bar store for the stock card.
+
+Re-downloading the whole day's 5-minute bars every minute means fetching
+~78 rows to learn about at most one new one. The store keeps each
+ticker's bars in memory and only asks Yahoo for bars from the last
+timestamp it already holds onwards; that last bar is re-fetched because
+it is still forming. Bars older than a rolling window are dropped, and
+only the most recently updated tickers are kept.
+
+A whole watchlist is topped up with a single batched yf.download call.
+"""
+
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import yfinance as yf
+
+from breaker import BREAKERS
+from budget import BUDGET, YAHOO
+
+
+def parse_watchlist(text):
+    """'aapl, msft,,AAPL ' -> ('AAPL', 'MSFT')"""
+    tickers = (t.strip().upper() for t in str(text or "").split(","))
+    return tuple(dict.fromkeys(t for t in tickers if t))
+
+
+def download_bars(tickers, start=None, interval="5m"):
+    """Download intraday bars for every ticker in one batched request.
+
+    Returns {ticker: bars}; the whole day is fetched if start is None.
+    """
+    period = {"period": "1d"} if start is None else {"start": start}
+    BREAKERS.before(YAHOO, budget=BUDGET)
+    # multi_level_index keeps (ticker, field) columns for a one-ticker watchlist too
+    data = yf.download(list(tickers), interval=interval, group_by="ticker", auto_adjust=False,
+                       multi_level_index=True, progress=False, **period)
+    # yfinance logs network errors and returns an empty frame instead of raising
+    BREAKERS.record(YAHOO, data is not None and not data.empty)
+    if data is None or data.empty:
+        return {}
+    present = set(data.columns.get_level_values(0))
+    return {t: data[t].dropna(how="all") for t in tickers if t in present}
+
+
+class BarStore:
+    """Per-ticker intraday bars, topped up incrementally"""
+
+    def __init__(self, window=pd.Timedelta(days=1), max_tickers=64, download=download_bars):
+        self.window = window
+        self.max_tickers = max_tickers
+        self.download = download
+        self._bars = OrderedDict()
+        self._lock = threading.Lock()
+
+    def update(self, tickers):
+        """Fetch bars newer than the ones held for tickers in a single download"""
+        with self._lock:
+            held = [self._bars.get(t) for t in tickers]
+        if any(bars is None or bars.empty for bars in held):
+            start = None
+        else:
+            start = min(bars.index[-1] for bars in held)
+        new = self.download(tickers, start=start)
+        with self._lock:
+            for ticker in tickers:
+                self._bars[ticker] = self._merge(self._bars.get(ticker), new.get(ticker))
+                self._bars.move_to_end(ticker)
+            while len(self._bars) > self.max_tickers:
+                self._bars.popitem(last=False)
+
+    def _merge(self, bars, new):
+        if new is None or new.empty:
+            return bars if bars is not None else pd.DataFrame()
+        if bars is None or bars.empty:
+            merged = new
+        else:
+            # New rows win: the previously last bar was still forming
+            merged = pd.concat([bars[bars.index < new.index[0]], new])
+            merged = merged[~merged.index.duplicated(keep="last")]
+        return merged[merged.index > merged.index[-1] - self.window]
+
+    def session(self, tickers, column="Close"):
+        """Latest trading session as one wide frame: Datetime index, a column per ticker"""
+        series = {}
+        with self._lock:
+            for ticker in tickers:
+                bars = self._bars.get(ticker)
+                if bars is None or bars.empty:
+                    continue
+                day = bars.index[-1].date()
+                series[ticker] = bars.loc[bars.index.date == day, column]
+        if not series:
+            return pd.DataFrame()
+        wide = pd.DataFrame(series)
+        wide.index.name = "Datetime"
+        return wide
+
+    def forget(self, ticker):
+        with self._lock:
+            self._bars.pop(ticker, None)
@@ -0,0 +1,177 @@
+"""
+Offline benchmarks for the dashboard's hot paths.
+
+    python bench/bench_callbacks.py
+    python bench/bench_callbacks.py --save baseline.json
+    python bench/bench_callbacks.py --compare baseline.json --tolerance 0.25
+
+Upstream APIs are replaced by stub_server.py and the Yahoo fixtures, and
+the snapshot store and geocodes go to a temporary directory. Runs are
+offline and repeatable. Cases:
+
+    fetch:<source>     one upstream fetch plus parsing (the helper minus its cache)
+    figure:<name>      figure construction plus JSON serialization
+    callback:<card>    a full /_dash-update-component request, first render
+    steady:<card>      the same request from a tab that already shows the data
+
+With --compare, the run exits with status 1 if any case's median is
+slower than the baseline's by more than the tolerance and --min-delta.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fixtures import install_yahoo  # noqa: E402
+from payloads import callback_payloads, with_state  # noqa: E402
+from stub_server import StubServer  # noqa: E402
+
+
+def load_app(state_dir, latency=0.0):
+    """Import app.py wired to a fresh stub server; returns (app module, stub)"""
+    stub = StubServer(latency=latency).start()
+    os.environ.update(stub.env())
+    os.environ["DASHBOARD_STATE_DIR"] = state_dir
+    os.environ["DASHBOARD_CACHE_URL"] = "memory://"
+    import app
+
+    install_yahoo(app)
+    return app, stub
+
+
+def seed_crypto_history(app, coins, hours):
+    """Fill the crypto ring buffers with `hours` of per-refresh samples, as after a day's uptime"""
+    step = app.REFRESH_SECONDS["crypto"]
+    end = time.time()
+    rng = np.random.default_rng(0)
+    for coin, price in zip(coins["id"], coins["current_price"]):
+        times = np.arange(end - hours * 3600, end, step)
+        walk = price * np.exp(np.cumsum(rng.normal(0, 0.001, len(times))))
+        for t, value in zip(times, walk):
+            app.CRYPTO_HISTORY.append(coin, float(t), float(value))
+
+
+def build_cases(app):
+    """{name: zero-argument function}, plus {name: response size} for callbacks"""
+    from plotly.io.json import to_json_plotly
+
+    ticker, country, city = app.DEFAULT_TICKER, app.DEFAULT_COUNTRY, app.DEFAULT_CITY
+    cases = {
+        "fetch:stock": lambda: app.fetch_stock_data.__wrapped__(ticker),
+        "fetch:covid": lambda: app.fetch_covid_data.__wrapped__(country),
+        "fetch:weather": lambda: app.fetch_weather.__wrapped__(city),
+        "fetch:crypto": lambda: app.fetch_crypto_data.__wrapped__(),
+        "fetch:marketcap": lambda: app.fetch_market_caps.__wrapped__(),
+        "fetch:news": lambda: app.fetch_tech_news.__wrapped__(),
+    }
+
+    stocks = app.fetch_stock_data.__wrapped__(ticker)
+    tickers = [c for c in stocks.columns if c != "Datetime"]
+    coins = app.fetch_crypto_data.__wrapped__().nlargest(app.CRYPTO_TOP_K, "market_cap")
+    seed_crypto_history(app, coins, app.CRYPTO_HISTORY_HOURS)
+    leaders = app.fetch_market_caps.__wrapped__()
+    cases.update({
+        "figure:stock": lambda: to_json_plotly(app.build_stock_figure(stocks, tickers, ticker)),
+        "figure:crypto": lambda: to_json_plotly(app.build_crypto_figure(coins)),
+        "figure:crypto_history": lambda: to_json_plotly(app.build_crypto_history_figure(coins)),
+        "figure:marketcap": lambda: to_json_plotly(app.build_marketcap_figure(leaders)),
+    })
+
+    client = app.app.server.test_client()
+    sizes = {}
+
+    def post(name, body):
+        def call():
+            response = client.post("/_dash-update-component", json=body)
+            if response.status_code not in (200, 204):
+                raise RuntimeError(f"{name}: HTTP {response.status_code}")
+            sizes[name] = len(response.data)
+            return response
+        return call
+
+    for card, body in callback_payloads(app.app).items():
+        cases[f"callback:{card}"] = post(f"callback:{card}", body)
+        first = cases[f"callback:{card}"]()
+        cases[f"steady:{card}"] = post(f"steady:{card}", with_state(body, first.get_json() or {}))
+    return cases, sizes
+
+
+def measure(func, repeat, warmup):
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return np.array(samples)
+
+
+def summarize(samples):
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99]) * 1000
+    return {"n": len(samples), "mean_ms": samples.mean() * 1000, "p50_ms": p50, "p95_ms": p95, "p99_ms": p99,
+            "ops_per_s": len(samples) / samples.sum()}
+
+
+def compare(results, baseline, tolerance, min_delta):
+    """Names of the cases whose median regressed beyond tolerance (and by at least min_delta ms)"""
+    slower = []
+    for name, stats in results.items():
+        base = baseline.get(name)
+        if (base and stats["p50_ms"] > base["p50_ms"] * (1 + tolerance)
+                and stats["p50_ms"] - base["p50_ms"] >= min_delta):
+            slower.append(name)
+            print(f"REGRESSION {name}: p50 {base['p50_ms']:.2f} -> {stats['p50_ms']:.2f} ms")
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard's callbacks, fetches and figures offline")
+    parser.add_argument("--repeat", type=int, default=50, help="timed runs per case (default: %(default)s)")
+    parser.add_argument("--warmup", type=int, default=5, help="untimed runs per case (default: %(default)s)")
+    parser.add_argument("-k", "--filter", default="", help="only run cases whose name contains this")
+    parser.add_argument("--save", metavar="PATH", help="write the results as JSON")
+    parser.add_argument("--compare", metavar="PATH", help="baseline JSON written by --save")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p50 slowdown vs baseline (default: %(default)s)")
+    parser.add_argument("--min-delta", type=float, default=0.5,
+                        help="ignore slowdowns smaller than this many ms (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as state_dir:
+        app, stub = load_app(state_dir)
+        try:
+            cases, sizes = build_cases(app)
+            results = {}
+            print(f"{'case':<26}{'n':>5}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ops/s':>10}{'bytes':>10}")
+            for name, func in cases.items():
+                if args.filter not in name:
+                    continue
+                stats = summarize(measure(func, args.repeat, args.warmup))
+                if name in sizes:
+                    stats["bytes"] = sizes[name]
+                results[name] = stats
+                print(f"{name:<26}{stats['n']:>5}{stats['mean_ms']:>10.2f}{stats['p50_ms']:>10.2f}"
+                      f"{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}{stats['ops_per_s']:>10.1f}"
+                      f"{stats.get('bytes', ''):>10}")
+        finally:
+            app.POLLER.stop()
+            stub.stop()
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            if compare(results, json.load(fh), args.tolerance, args.min_delta):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Recorded upstream responses used by the benchmarks and the load test.
+
+The JSON files are upstream responses, replayed by stub_server.py. The
+Yahoo data (intraday bars, share counts and closes) is replayed in
+process, because yfinance cannot be pointed at another host.
+install_yahoo() swaps the stub functions in for the live downloads.
+
+Refresh the files from the live APIs with record_fixtures.py.
+"""
+
+import json
+import os
+
+import pandas as pd
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def path(name):
+    return os.path.join(FIXTURES_DIR, name)
+
+
+def load_json(name):
+    with open(path(name), encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def load_bars():
+    """{ticker: 5-minute bars indexed by Datetime}, as yf.download returns them"""
+    df = pd.read_csv(path("stock_bars.csv"))
+    df["Datetime"] = pd.to_datetime(df["Datetime"], utc=True).dt.tz_convert("America/New_York")
+    return {ticker: bars.drop(columns="Ticker").set_index("Datetime")
+            for ticker, bars in df.groupby("Ticker", sort=False)}
+
+
+BARS = load_bars()
+MARKETCAPS = load_json("marketcaps.json")
+
+
+def download_bars(tickers, start=None, interval="5m"):
+    """Stand-in for bars.download_bars serving the recorded session"""
+    found = {}
+    for ticker in tickers:
+        bars = BARS.get(ticker)
+        if bars is not None:
+            found[ticker] = bars if start is None else bars[bars.index >= start]
+    return found
+
+
+def fetch_share_info(ticker):
+    """Stand-in for marketcaps.fetch_share_info"""
+    shares, currency = MARKETCAPS["shares"][ticker]
+    return shares, currency
+
+
+def download_closes(symbols):
+    """Stand-in for marketcaps.download_closes"""
+    closes = MARKETCAPS["closes"]
+    return {symbol: closes[symbol] for symbol in symbols if symbol in closes}
+
+
+def install_yahoo(app):
+    """Serve the app's Yahoo-backed sources (stock, marketcap) from the fixtures"""
+    import marketcaps
+
+    app.STOCK_BARS.download = download_bars
+    marketcaps.fetch_share_info = fetch_share_info
+    marketcaps.download_closes = download_closes
@@ -0,0 +1,380 @@
+"""
+Load generator: N simulated dashboard tabs against a stubbed instance.
+
+    python bench/loadtest.py --tabs 10,50,100,200 --duration 30
+    python bench/loadtest.py --timer-only --tabs 10,50,100 --speedup 10
+    python bench/loadtest.py --url http://127.0.0.1:8050 --tabs 100
+
+Each tab loads the page, fires the initial callbacks and opens a /_push
+stream, as assets/push.js does. It then replays the exact
+/_dash-update-component bodies of the six cards:
+
+  * on every push message, for the card whose source changed;
+  * on each card's dcc.Interval tick, at the interval the layout actually
+    sets (the keep-alive period while push is on).
+
+If the stream is refused (503 at the worker's stream limit) or drops,
+the tab falls back to polling every card at its refresh period, as
+push.js does. --timer-only skips the streams and polls from the start,
+which is the worst case. Every tab keeps its own Store values
+(fingerprints, rendered state) from the responses it gets, as a browser
+would.
+
+--speedup S divides every timer interval by S. In --timer-only mode N tabs
+then offer the load of N*S viewers. Streams are not multiplied: N tabs
+always hold N of them, so push mode defaults to --speedup 1. Unless --url
+is given, the app is started with serve_stubbed.py against
+stub_server.py, fully offline.
+
+Latency is measured from when a request was due, not when it was sent,
+so client-side queueing counts. A step is saturated when throughput
+falls below 90% of the requests that came due, p99 exceeds --slo, or more
+than 1% of requests fail. Streams refused by the server are reported
+separately. Between steps the harness waits --drain seconds, so that the
+server notices closed streams and frees their threads.
+"""
+
+import argparse
+import heapq
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from payloads import callback_payloads, initial_cards, timer_intervals, with_state  # noqa: E402
+from stub_server import StubServer  # noqa: E402
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PAGE_LOAD = ("/", "/_dash-layout", "/_dash-dependencies")
+
+
+class Tab:
+    """One browser tab: its callback bodies, the Store values it holds and its timers"""
+
+    def __init__(self, index, bodies, timers, fallback):
+        self.index = index
+        self.bodies = dict(bodies)
+        self.ticks = dict.fromkeys(bodies, 0)
+        self.timers = timers
+        self.fallback = fallback
+        self.polling = False
+        # Bumped when the timers are reset; ticks scheduled before are dropped
+        self.generation = 0
+        self.lock = threading.Lock()
+
+    def cadence(self, card):
+        return (self.fallback if self.polling else self.timers)[card]
+
+    def next_body(self, card):
+        """The body for the card's next timer tick"""
+        with self.lock:
+            self.ticks[card] += 1
+            return self._trigger(card, f"{card}-interval", "n_intervals", self.ticks[card])
+
+    def push_body(self, card, version):
+        """The body sent when push.js bumps the card's push-<source> Store"""
+        with self.lock:
+            return self._trigger(card, f"push-{card}", "data", version)
+
+    def _trigger(self, card, cid, prop, value):
+        body = self.bodies[card]
+        inputs = [{**item, "value": value} if (item["id"], item["property"]) == (cid, prop) else item
+                  for item in body["inputs"]]
+        return {**body, "inputs": inputs, "changedPropIds": [f"{cid}.{prop}"]}
+
+    def update(self, card, response):
+        with self.lock:
+            self.bodies[card] = with_state(self.bodies[card], response)
+
+
+class Schedule:
+    """Due page loads and timer ticks of every tab, in time order.
+
+    Fed by the driver loop and by the stream readers, which reset a tab's
+    timers when it falls back to polling.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._seq = 0
+        self._cond = threading.Condition()
+
+    def add(self, due, index, card, generation=0):
+        """card None is the tab's page load"""
+        with self._cond:
+            heapq.heappush(self._heap, (due, self._seq, index, card, generation))
+            self._seq += 1
+            self._cond.notify()
+
+    def next(self, stop_at):
+        """Block until the earliest entry is due and pop it; None once stop_at has passed"""
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if now >= stop_at:
+                    return None
+                if self._heap and self._heap[0][0] <= now:
+                    return heapq.heappop(self._heap)
+                until = min(self._heap[0][0], stop_at) if self._heap else stop_at
+                self._cond.wait(until - now)
+
+
+class Recorder:
+    """Latencies and failures of one load step"""
+
+    def __init__(self):
+        self.latencies = []
+        self.errors = 0
+        self.due = 0
+        self.page_loads = 0
+        self.streams = 0
+        self.refused = 0
+        self.lock = threading.Lock()
+
+    def count(self, field):
+        with self.lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def record(self, latency, ok):
+        with self.lock:
+            if ok:
+                self.latencies.append(latency)
+            else:
+                self.errors += 1
+
+
+def run_step(url, bodies, timers, fallback, tabs, duration, speedup, concurrency, initial, push=True):
+    """Simulate `tabs` tabs for `duration` seconds; returns the step's Recorder"""
+    recorder = Recorder()
+    local = threading.local()
+    stop = threading.Event()
+    stop_at = time.monotonic() + duration
+    schedule = Schedule()
+    streams, streams_lock = [], threading.Lock()
+    pool = ThreadPoolExecutor(max_workers=concurrency)
+
+    def session():
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        return local.session
+
+    def submit(tab, card, due, body=None):
+        if stop.is_set():
+            return
+        recorder.count("due")
+        try:
+            pool.submit(fire, tab, card, due, body)
+        except RuntimeError:
+            pass  # the step is over
+
+    def page_load(tab, due):
+        for path in PAGE_LOAD:
+            try:
+                session().get(url + path, timeout=30).raise_for_status()
+            except requests.RequestException:
+                recorder.record(0.0, False)
+                return
+        recorder.count("page_loads")
+        if push:
+            threading.Thread(target=listen, args=(tab,), daemon=True).start()
+        for card in initial:
+            submit(tab, card, due, tab.bodies[card])
+
+    def fire(tab, card, due, body=None):
+        body = body or tab.next_body(card)
+        try:
+            response = session().post(f"{url}/_dash-update-component", json=body, timeout=30)
+            ok = response.status_code in (200, 204)
+            if response.status_code == 200:
+                tab.update(card, response.json())
+        except requests.RequestException:
+            ok = False
+        recorder.record(time.monotonic() - due, ok)
+
+    def fall_back(tab):
+        """push.js's fallback: every card's timer restarts at its refresh period"""
+        if stop.is_set():
+            return
+        with tab.lock:
+            tab.polling = True
+            tab.generation += 1
+        now = time.monotonic()
+        for card in tab.fallback:
+            schedule.add(now + tab.cadence(card) / speedup, tab.index, card, tab.generation)
+
+    def listen(tab):
+        """The tab's /_push EventSource: fire the card of every message"""
+        try:
+            response = requests.get(f"{url}/_push", stream=True, timeout=(5, 60))
+        except requests.RequestException:
+            recorder.count("refused")
+            return fall_back(tab)
+        if response.status_code != 200:
+            response.close()
+            recorder.count("refused")
+            return fall_back(tab)
+        recorder.count("streams")
+        with streams_lock:
+            streams.append(response)
+        try:
+            for line in response.iter_lines(decode_unicode=True):
+                if line and line.startswith("data:"):
+                    message = json.loads(line[len("data:"):])
+                    if message["source"] in tab.bodies:
+                        card = message["source"]
+                        submit(tab, card, time.monotonic(), tab.push_body(card, message["version"]))
+        except Exception:
+            pass  # closed at the end of the step, or dropped by the server
+        finally:
+            response.close()
+        fall_back(tab)
+
+    simulated = [Tab(i, bodies, timers if push else fallback, fallback) for i in range(tabs)]
+    ramp = min(min(fallback.values()) / speedup, duration / 3)
+    for tab in simulated:
+        start = time.monotonic() + random.uniform(0, ramp)
+        schedule.add(start, tab.index, None)
+        for card in bodies:
+            schedule.add(start + tab.cadence(card) / speedup, tab.index, card)
+
+    try:
+        while True:
+            entry = schedule.next(stop_at)
+            if entry is None:
+                break
+            due, _, i, card, generation = entry
+            tab = simulated[i]
+            if card is None:
+                pool.submit(page_load, tab, due)
+            elif generation == tab.generation:
+                submit(tab, card, due)
+                schedule.add(due + tab.cadence(card) / speedup, i, card, generation)
+    finally:
+        stop.set()
+        with streams_lock:
+            for response in streams:
+                response.close()
+        pool.shutdown(wait=True, cancel_futures=True)
+    return recorder
+
+
+def summarize(recorder, tabs, duration, slo_ms):
+    latencies = np.array(recorder.latencies) * 1000
+    done = len(latencies)
+    total = done + recorder.errors
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if done else (float("nan"),) * 3
+    offered = recorder.due / duration
+    throughput = done / duration
+    error_rate = recorder.errors / total if total else 0.0
+    saturated = throughput < 0.9 * offered or not p99 <= slo_ms or error_rate > 0.01
+    return {"tabs": tabs, "offered_rps": offered, "throughput_rps": throughput, "p50_ms": p50, "p95_ms": p95,
+            "p99_ms": p99, "errors": recorder.errors, "page_loads": recorder.page_loads,
+            "streams": recorder.streams, "streams_refused": recorder.refused, "saturated": saturated}
+
+
+def wait_until_up(url, timeout=90):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(url + "/", timeout=5).ok:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"dashboard at {url} did not come up within {timeout}s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate N concurrent dashboard tabs and find the saturation point")
+    parser.add_argument("--tabs", default="10,25,50,100", help="comma-separated tab counts, one step each")
+    parser.add_argument("--duration", type=float, default=30, help="seconds per step (default: %(default)s)")
+    parser.add_argument("--timer-only", action="store_true", help="no /_push streams; every tab polls at the refresh periods")
+    parser.add_argument("--speedup", type=float, help="divide every timer interval by this (default: 1, or 10 with --timer-only)")
+    parser.add_argument("--concurrency", type=int, default=64, help="max requests in flight (default: %(default)s)")
+    parser.add_argument("--slo", type=float, default=1000, help="p99 latency limit in ms (default: %(default)s)")
+    parser.add_argument("--drain", type=float, default=35,
+                        help="seconds to wait between push-mode steps while the server frees closed streams (default: %(default)s)")
+    parser.add_argument("--url", help="existing dashboard to load; by default one is started on stubbed upstreams")
+    parser.add_argument("--port", type=int, default=8097, help="port for the started dashboard")
+    parser.add_argument("--workers", type=int, default=1, help="gunicorn workers for the started dashboard")
+    parser.add_argument("--threads", type=int, default=32, help="threads per worker of the started dashboard")
+    parser.add_argument("--upstream-latency", type=float, default=0, help="ms added to every stubbed upstream response")
+    parser.add_argument("--save", metavar="PATH", help="write the step results as JSON")
+    args = parser.parse_args(argv)
+    push = not args.timer_only
+    speedup = args.speedup or (1 if push else 10)
+
+    with tempfile.TemporaryDirectory() as state_dir:
+        stub = StubServer(latency=args.upstream_latency / 1000).start()
+        env = {**os.environ, **stub.env(), "DASHBOARD_STATE_DIR": state_dir}
+        # The payloads and intervals come from the same app configuration
+        os.environ.update({**stub.env(), "DASHBOARD_STATE_DIR": os.path.join(state_dir, "client")})
+        import app
+
+        bodies = callback_payloads(app.app)
+        timers = timer_intervals(app.app)
+        fallback = {card: app.REFRESH_SECONDS[card] for card in bodies}
+
+        server = None
+        url = args.url
+        if url is None:
+            url = f"http://127.0.0.1:{args.port}"
+            server = subprocess.Popen(
+                [sys.executable, os.path.join(HERE, "serve_stubbed.py"), "--port", str(args.port),
+                 "--workers", str(args.workers), "--threads", str(args.threads)],
+                env=env,
+            )
+        try:
+            wait_until_up(url)
+            initial = initial_cards(requests.get(f"{url}/_dash-dependencies", timeout=30).json())
+            results = []
+            print(f"{'tabs':>6}{'viewers':>9}{'due/s':>8}{'done/s':>9}{'p50 ms':>9}{'p95 ms':>9}"
+                  f"{'p99 ms':>9}{'errors':>8}{'streams':>9}{'refused':>9}  saturated")
+            for n, tabs in enumerate(int(n) for n in args.tabs.split(",")):
+                if push and n:
+                    time.sleep(args.drain)
+                recorder = run_step(url, bodies, timers, fallback, tabs, args.duration, speedup, args.concurrency,
+                                    initial, push=push)
+                step = summarize(recorder, tabs, args.duration, args.slo)
+                results.append(step)
+                print(f"{tabs:>6}{int(tabs * speedup):>9}{step['offered_rps']:>8.1f}{step['throughput_rps']:>9.1f}"
+                      f"{step['p50_ms']:>9.1f}{step['p95_ms']:>9.1f}{step['p99_ms']:>9.1f}{step['errors']:>8}"
+                      f"{step['streams']:>9}{step['streams_refused']:>9}  {'yes' if step['saturated'] else 'no'}")
+        finally:
+            if server is not None:
+                # Threads blocked in /_push streams don't exit on their own
+                server.send_signal(signal.SIGINT)
+                try:
+                    server.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    server.kill()
+                    server.wait()
+            stub.stop()
+
+    ok = [s["tabs"] for s in results if not s["saturated"]]
+    bad = [s["tabs"] for s in results if s["saturated"]]
+    if not bad:
+        print(f"not saturated at {max(ok)} tabs ({int(max(ok) * speedup)} viewers); try more tabs")
+    elif not ok or min(bad) < max(ok):
+        print(f"saturated from {min(bad)} tabs ({int(min(bad) * speedup)} viewers)")
+    else:
+        print(f"saturation point between {max(ok)} and {min(bad)} tabs "
+              f"({int(max(ok) * speedup)}-{int(min(bad) * speedup)} viewers)")
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
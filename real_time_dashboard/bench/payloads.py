@@ -0,0 +1,76 @@
+"""
+The /_dash-update-component request bodies the browser sends for each card.
+
+Bodies are built from app.callback_map and the layout's initial property
+values, the same way the Dash renderer builds them. Values not set in the
+layout are sent as null. The card name is the first output's id prefix
+("stock-graph" -> "stock").
+"""
+
+
+def layout_values(layout):
+    """{(component id, prop): value} for every property set in the layout"""
+    values = {}
+    for component in layout._traverse():
+        cid = getattr(component, "id", None)
+        if cid is None:
+            continue
+        for prop in component._prop_names:
+            value = getattr(component, prop, None)
+            if value is not None and prop != "children":
+                values[(cid, prop)] = value
+    return values
+
+
+def _card(output_key):
+    return output_key.strip(".").split(".")[0].split("-")[0]
+
+
+def callback_payloads(app, overrides=None):
+    """{card: request body} for every callback, e.g. bodies["stock"]
+
+    overrides maps (component id, prop) to the value to send instead of
+    the layout's, e.g. {("stock-ticker", "value"): "MSFT"}.
+    """
+    values = layout_values(app.layout)
+    values.update(overrides or {})
+    bodies = {}
+    for output_key, spec in app.callback_map.items():
+        outputs = [{"id": o.component_id, "property": o.component_property} for o in spec["output"]]
+
+        def deps(items):
+            return [{**item, "value": values.get((item["id"], item["property"]))} for item in items]
+
+        bodies[_card(output_key)] = {
+            "output": output_key,
+            "outputs": outputs,
+            "inputs": deps(spec["inputs"]),
+            "changedPropIds": [],
+            "state": deps(spec["state"]),
+        }
+    return bodies
+
+
+def timer_intervals(app):
+    """{card: seconds} from the layout's dcc.Interval components ("<card>-interval")"""
+    return {cid[:-len("-interval")]: value / 1000 for (cid, prop), value in layout_values(app.layout).items()
+            if prop == "interval" and isinstance(cid, str) and cid.endswith("-interval")}
+
+
+def initial_cards(dependencies):
+    """Cards whose callback fires on page load, from the /_dash-dependencies JSON"""
+    return [_card(dep["output"]) for dep in dependencies if not dep.get("prevent_initial_call")]
+
+
+def with_state(body, response):
+    """A copy of body whose State values are the Store outputs of a previous response.
+
+    Replays the steady state of an open tab: its fingerprint stores already
+    hold what was last rendered, so unchanged data comes back as no_update.
+    """
+    returned = response.get("response", {})
+    state = []
+    for item in body["state"]:
+        value = returned.get(item["id"], {}).get(item["property"], item["value"])
+        state.append({**item, "value": value})
+    return {**body, "state": state}
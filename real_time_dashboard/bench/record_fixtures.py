@@ -0,0 +1,77 @@
+"""
+Re-record bench/fixtures from the live APIs (needs network access).
+
+    python bench/record_fixtures.py
+
+Uses the same requests the dashboard makes for its default inputs, so
+the fixtures track the upstreams' current response shapes and sizes.
+"""
+
+import csv
+import json
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bars import download_bars  # noqa: E402
+from config import DEFAULT_CITY, DEFAULT_COUNTRY, UPSTREAMS  # noqa: E402
+from fixtures import path  # noqa: E402
+from http_client import HttpClient  # noqa: E402
+from marketcaps import download_closes, fetch_share_info, load_universe  # noqa: E402
+
+STOCK_TICKERS = ["AAPL", "MSFT", "GOOGL", "AMZN", "NVDA", "TSLA", "META"]
+UNIVERSE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "marketcap_universe.csv")
+
+
+def save_json(name, data):
+    with open(path(name), "w", encoding="utf-8") as fh:
+        json.dump(data, fh, indent=1)
+    print(f"recorded {name}")
+
+
+def record_http(http):
+    save_json("coins_markets.json", http.get_json(f"{UPSTREAMS['coingecko']}/coins/markets", params={
+        "vs_currency": "usd", "order": "market_cap_desc", "per_page": 250, "page": 1}))
+    save_json("covid_country.json", http.get_json(f"{UPSTREAMS['disease']}/covid-19/countries/{DEFAULT_COUNTRY}",
+                                                  params={"strict": "true"}))
+    geo = http.get_json(f"{UPSTREAMS['geocoding']}/search", params={"name": DEFAULT_CITY, "count": 1})
+    save_json("geocoding_search.json", geo)
+    place = geo["results"][0]
+    save_json("forecast.json", http.get_json(f"{UPSTREAMS['forecast']}/forecast", params={
+        "latitude": place["latitude"], "longitude": place["longitude"], "current_weather": "true"}))
+    save_json("hn_search.json", http.get_json(f"{UPSTREAMS['hn']}/search", params={
+        "query": "technology", "tags": "story", "hitsPerPage": 5}))
+
+
+def record_yahoo():
+    bars = download_bars(STOCK_TICKERS)
+    with open(path("stock_bars.csv"), "w", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(["Datetime", "Ticker", "Open", "High", "Low", "Close", "Adj Close", "Volume"])
+        for ticker, frame in bars.items():
+            for when, row in frame.iterrows():
+                writer.writerow([when.isoformat(), ticker, row["Open"], row["High"], row["Low"], row["Close"],
+                                 row["Adj Close"], row["Volume"]])
+    print("recorded stock_bars.csv")
+
+    names, _ = load_universe(UNIVERSE)
+    shares = {}
+    for ticker in names:
+        try:
+            count, currency = fetch_share_info(ticker)
+        except Exception as exc:
+            print(f"skipped {ticker}: {exc}")
+            continue
+        if count and not pd.isna(count):
+            shares[ticker] = [int(count), currency]
+    fx = {f"{currency}USD=X" for _, currency in shares.values() if currency and currency != "USD"}
+    closes = download_closes(list(shares) + sorted(fx))
+    save_json("marketcaps.json", {"shares": shares, "closes": closes})
+
+
+if __name__ == "__main__":
+    record_http(HttpClient())
+    record_yahoo()
@@ -0,0 +1,67 @@
+"""
+Run the dashboard against recorded upstreams, for loadtest.py.
+
+    python bench/serve_stubbed.py --port 8050 --workers 4
+
+The HTTP upstreams are whatever DASHBOARD_<NAME>_URL points at (normally
+stub_server.py). The Yahoo sources are served from the fixtures, which
+can only be done in process. The app is served by gunicorn with gthread
+workers, as in production, or by Flask's threaded server with
+--server flask.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fixtures import install_yahoo  # noqa: E402
+
+
+def serve_gunicorn(server, host, port, workers, threads):
+    from gunicorn.app.base import BaseApplication
+
+    class Stubbed(BaseApplication):
+        def load_config(self):
+            settings = {"bind": f"{host}:{port}", "workers": workers, "worker_class": "gthread",
+                        "threads": threads, "timeout": 60, "keepalive": 5, "loglevel": "warning"}
+            for key, value in settings.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return server
+
+    Stubbed().run()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the dashboard with recorded upstream data")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8050)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--server", choices=["gunicorn", "flask"], default="gunicorn")
+    args = parser.parse_args(argv)
+
+    if args.workers > 1 and "DASHBOARD_CACHE_URL" not in os.environ:
+        # As gunicorn.conf.py does: workers share one fetch cache
+        state = os.environ.get("DASHBOARD_STATE_DIR", ".")
+        os.environ["DASHBOARD_CACHE_URL"] = f"sqlite:///{os.path.join(state, 'cache.sqlite3')}"
+    os.environ.setdefault("DASHBOARD_ENV", "production")
+    # Each worker takes its share of the request budgets, as under gunicorn.conf.py
+    os.environ["DASHBOARD_WORKERS"] = str(args.workers if args.server == "gunicorn" else 1)
+    # Sizes the /_push stream limit, as gunicorn.conf.py's threads setting does
+    os.environ.setdefault("DASHBOARD_THREADS", str(args.threads))
+
+    import app
+
+    install_yahoo(app)
+    if args.server == "flask":
+        app.app.run(host=args.host, port=args.port, debug=False, threaded=True)
+    else:
+        serve_gunicorn(app.app.server, args.host, args.port, args.workers, args.threads)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Local stand-in for the dashboard's HTTP upstreams, serving bench/fixtures.
+
+Each upstream is mounted under its own prefix (/coingecko, /disease,
+/geocoding, /forecast, /hn). Point the app at it through the
+DASHBOARD_<NAME>_URL variables read by config.py:
+
+    python bench/stub_server.py --port 8900 --latency 50
+    # prints the export lines to paste into the dashboard's shell
+
+--latency adds a fixed delay to every response to mimic a real API.
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from fixtures import load_json
+
+# The keys of config.DEFAULT_UPSTREAMS. config.py is not imported here: it
+# reads the environment once, and these variables have to be set first.
+UPSTREAMS = ("coingecko", "disease", "geocoding", "forecast", "hn")
+
+
+def upstream_env(base_url):
+    """DASHBOARD_<NAME>_URL settings pointing every upstream at base_url"""
+    return {f"DASHBOARD_{name.upper()}_URL": f"{base_url}/{name}" for name in UPSTREAMS}
+
+
+class StubServer:
+    """Threaded HTTP server replaying the recorded upstream responses"""
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0):
+        self.latency = latency
+        self.coins = load_json("coins_markets.json")
+        self.covid = load_json("covid_country.json")
+        # Responses that never vary are encoded once
+        self.static = {
+            "/geocoding/search": json.dumps(load_json("geocoding_search.json")).encode(),
+            "/forecast/forecast": json.dumps(load_json("forecast.json")).encode(),
+            "/hn/search": json.dumps(load_json("hn_search.json")).encode(),
+        }
+        self.requests = 0
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self):
+        return upstream_env(self.base_url)
+
+    def respond(self, path, query):
+        """(status, body) for a request path and its parsed query string"""
+        if path in self.static:
+            return 200, self.static[path]
+        if path == "/coingecko/coins/markets":
+            per_page = int(query.get("per_page", ["100"])[0])
+            page = int(query.get("page", ["1"])[0])
+            coins = self.coins
+            if "ids" in query:
+                ids = set(query["ids"][0].split(","))
+                coins = [c for c in coins if c["id"] in ids]
+            return 200, json.dumps(coins[(page - 1) * per_page:page * per_page]).encode()
+        if path.startswith("/disease/covid-19/countries/"):
+            country = path.rsplit("/", 1)[-1]
+            return 200, json.dumps({**self.covid, "country": country}).encode()
+        return 404, b'{"message": "not found"}'
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out as separate writes; without this, delayed
+            # ACKs add ~40 ms to every keep-alive response
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                status, body = stub.respond(url.path, parse_qs(url.query))
+                with stub._lock:
+                    stub.requests += 1
+                if stub.latency:
+                    time.sleep(stub.latency)
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve recorded upstream responses for the dashboard")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=0.0, help="milliseconds added to every response")
+    args = parser.parse_args(argv)
+    stub = StubServer(args.host, args.port, latency=args.latency / 1000)
+    for name, value in stub.env().items():
+        print(f"export {name}={value}", flush=True)
+    try:
+        stub.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
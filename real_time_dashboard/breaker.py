@@ -0,0 +1,150 @@
+"""
+Circuit breakers for the upstream APIs, one per host.
+
+A breaker starts closed. After `threshold` consecutive failures it opens
+and every call fails at once with CircuitOpen, without touching the
+network. Once `cooldown` seconds have passed it goes half-open and lets
+a single probe call through. If the probe succeeds the breaker closes;
+if it fails the breaker opens for another cool-down.
+
+Only upstream faults count as failures: connection errors, timeouts,
+429 and 5xx responses. A 404 for a mistyped country is the caller's
+problem and must not cut the source off for every viewer.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+import requests
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpen(Exception):
+    """A call was short-circuited because its host's breaker is open"""
+
+    def __init__(self, host, retry_after):
+        super().__init__(f"circuit for {host} is open; next probe in {retry_after:.1f}s")
+        self.host = host
+        self.retry_after = retry_after
+
+
+def is_upstream_failure(exc):
+    """True for errors that say the upstream is unhealthy, not the request"""
+    if isinstance(exc, requests.HTTPError) and exc.response is not None:
+        return exc.response.status_code == 429 or exc.response.status_code >= 500
+    return isinstance(exc, (requests.ConnectionError, requests.Timeout, OSError))
+
+
+class CircuitBreaker:
+    """Closed -> open after threshold failures -> half-open after cooldown"""
+
+    def __init__(self, threshold=5, cooldown=30):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.short_circuited = 0
+        self._probe_started = None
+
+    def allow(self, now):
+        """0.0 if a call may go out now, else the seconds until the next probe"""
+        if self.state == OPEN:
+            wait = self.opened_at + self.cooldown - now
+            if wait > 0:
+                self.short_circuited += 1
+                return wait
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN:
+            # One probe at a time; a probe that never reported back expires
+            if self._probe_started is not None and now - self._probe_started < self.cooldown:
+                self.short_circuited += 1
+                return self._probe_started + self.cooldown - now
+            self._probe_started = now
+        return 0.0
+
+    def cancel(self):
+        """The call allowed through never went out; free the half-open probe slot"""
+        self._probe_started = None
+
+    def record(self, ok, now):
+        self._probe_started = None
+        if ok:
+            self.state = CLOSED
+            self.failures = 0
+            return
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.threshold:
+            self.state = OPEN
+            self.opened_at = now
+
+    def as_dict(self):
+        return {"state": self.state, "failures": self.failures, "short_circuited": self.short_circuited}
+
+
+class Breakers:
+    """A CircuitBreaker per upstream host, created on first use"""
+
+    def __init__(self, threshold=5, cooldown=30):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def _get(self, host):
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = self._breakers[host] = CircuitBreaker(self.threshold, self.cooldown)
+        return breaker
+
+    def before(self, host, budget=None):
+        """Raise CircuitOpen if calls to host are being short-circuited.
+
+        With a budget (budget.Budget), a token is spent only once the breaker
+        has let the call through, so short-circuited calls cost nothing; if
+        the budget refuses, the breaker is left as it was.
+        """
+        with self._lock:
+            wait = self._get(host).allow(time.monotonic())
+        if wait:
+            raise CircuitOpen(host, wait)
+        if budget is not None:
+            try:
+                budget.take(host)
+            except Exception:
+                with self._lock:
+                    self._get(host).cancel()
+                raise
+
+    def record(self, host, ok):
+        with self._lock:
+            self._get(host).record(ok, time.monotonic())
+
+    @contextmanager
+    def guard(self, host, budget=None):
+        """Short-circuit the block if host's breaker is open, else record its outcome"""
+        self.before(host, budget)
+        try:
+            yield
+        except Exception as exc:
+            self.record(host, not is_upstream_failure(exc))
+            raise
+        self.record(host, True)
+
+    def states(self):
+        """Snapshot of every breaker, e.g. {"disease.sh": {"state": "open", ...}}"""
+        with self._lock:
+            return {host: breaker.as_dict() for host, breaker in self._breakers.items()}
+
+
+BREAKERS = Breakers()
+
+
+def register_breakers(server, breakers=BREAKERS, path="/_breakers"):
+    """Expose every upstream's breaker state as JSON"""
+
+    @server.route(path)
+    def circuit_breakers():
+        return breakers.states()
@@ -0,0 +1,124 @@
+"""
+Per-host request budgets for the upstream APIs.
+
+Each host gets a token bucket. It refills at the host's sustained rate
+and holds up to a burst of tokens, and every upstream call spends one
+token. When a bucket is empty the call raises BudgetExhausted instead of
+going out. The fetch helpers treat that like any other failed fetch, so
+the poller keeps serving the last good snapshot until tokens come back.
+
+HttpClient spends tokens automatically. yfinance has its own session, so
+the Yahoo helpers pass ``BUDGET`` to ``BREAKERS.before``/``guard``
+themselves. Either way the token is taken only after the circuit breaker
+has let the call through.
+
+Buckets live in each process. With several gunicorn workers, each one
+gets a 1/DASHBOARD_WORKERS share of every host's rate and burst, so the
+workers together stay inside the host's limit.
+"""
+
+import threading
+import time
+
+from config import WORKERS
+
+YAHOO = "finance.yahoo.com"
+
+# host -> (calls, per seconds, burst). Kept below each API's published
+# (or commonly observed) free-tier limit.
+DEFAULT_LIMITS = {
+    "api.coingecko.com": (25, 60, 10),
+    "disease.sh": (60, 60, 20),
+    "api.open-meteo.com": (5000, 86400, 50),
+    "geocoding-api.open-meteo.com": (5000, 86400, 50),
+    "hn.algolia.com": (5000, 3600, 20),
+    YAHOO: (1500, 3600, 120),
+}
+
+
+class BudgetExhausted(Exception):
+    """An upstream call was refused because its host is out of tokens"""
+
+    def __init__(self, host, retry_after):
+        super().__init__(f"request budget for {host} exhausted; retry in {retry_after:.1f}s")
+        self.host = host
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Refills at rate tokens/second, holding at most burst tokens"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.spent = 0
+        self.refused = 0
+        self._updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def take(self, n=1):
+        """Spend n tokens; returns 0.0, or the seconds until n tokens are available"""
+        self._refill(time.monotonic())
+        if self.tokens >= n:
+            self.tokens -= n
+            self.spent += n
+            return 0.0
+        self.refused += n
+        return (n - self.tokens) / self.rate
+
+    def as_dict(self):
+        self._refill(time.monotonic())
+        return {
+            "remaining": int(self.tokens),
+            "burst": self.burst,
+            "per_minute": round(self.rate * 60, 2),
+            "spent": self.spent,
+            "refused": self.refused,
+        }
+
+
+class Budget:
+    """Token buckets per upstream host; hosts without a limit are never refused.
+
+    share scales every limit, e.g. 1/4 for one of four worker processes.
+    """
+
+    def __init__(self, limits=None, share=1.0):
+        self.share = share
+        self._buckets = {}
+        self._lock = threading.Lock()
+        for host, (calls, per, burst) in (limits or {}).items():
+            self.limit(host, calls, per, burst)
+
+    def limit(self, host, calls, per, burst=None):
+        """Allow host `calls` requests every `per` seconds, in bursts of up to `burst`"""
+        with self._lock:
+            self._buckets[host] = TokenBucket(calls * self.share / per, max(1, (burst or calls) * self.share))
+
+    def take(self, host, n=1):
+        """Spend n tokens for host or raise BudgetExhausted"""
+        with self._lock:
+            bucket = self._buckets.get(host)
+            wait = bucket.take(n) if bucket is not None else 0.0
+        if wait:
+            raise BudgetExhausted(host, wait)
+
+    def remaining(self):
+        """Snapshot of every bucket, e.g. {"api.coingecko.com": {"remaining": 9, ...}}"""
+        with self._lock:
+            return {host: bucket.as_dict() for host, bucket in self._buckets.items()}
+
+
+BUDGET = Budget(DEFAULT_LIMITS, share=1 / WORKERS)
+
+
+def register_budget(server, budget=BUDGET, path="/_budget"):
+    """Expose the remaining request budget per host as JSON"""
+
+    @server.route(path)
+    def request_budget():
+        return budget.remaining()
@@ -0,0 +1,230 @@
+"""
+Process-wide TTL + LRU cache for the dashboard's fetch helpers.
+
+Every browser tab runs its own dcc.Interval timers, so without a shared
+cache each tab triggers its own upstream request. Entries are keyed on
+the fetch function and its arguments, expire after a per-source TTL and
+are evicted least-recently-used once the cache is full.
+
+Concurrent misses for the same key are coalesced (single-flight): one
+caller goes upstream and the others wait for its result.
+
+The in-process TTLCache is the default backend. Under several worker
+processes, ``set_backend`` swaps in a shared one (see shared_cache.py);
+its leases extend single-flight across processes, so all workers share
+one upstream fetch per source per refresh window.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from functools import wraps
+
+from metrics import CACHE_REQUESTS, FETCH_ERRORS, FETCH_SECONDS
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after a per-entry TTL"""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=_MISSING, max_age=None):
+        """Return the cached value for key, or default if missing/expired.
+
+        With max_age, entries stored more than max_age seconds ago also miss.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires, stored_at, value = entry
+            if expires <= now:
+                del self._data[key]
+                self.misses += 1
+                return default
+            if max_age is not None and now - stored_at > max_age:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl):
+        """Store value under key for ttl seconds, evicting the LRU entry if full"""
+        now = time.monotonic()
+        with self._lock:
+            self._data[key] = (now + ttl, now, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def acquire(self, key, ttl):
+        """Cross-process fetch lease; in one process SingleFlight already suffices"""
+        return True
+
+    def release(self, key):
+        pass
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SingleFlight:
+    """Collapse concurrent calls for the same key into one execution"""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """Run fn() unless a call for key is already in flight; then share its result"""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            return future.result()
+        try:
+            future.set_result(fn())
+        except BaseException as exc:
+            future.set_exception(exc)
+        finally:
+            with self._lock:
+                del self._calls[key]
+        return future.result()
+
+    def in_flight(self):
+        return len(self._calls)
+
+
+CACHE = TTLCache(maxsize=256)
+FLIGHTS = SingleFlight()
+
+
+def set_backend(cache):
+    """Use cache (a TTLCache or a shared backend) for every @cached helper"""
+    global CACHE
+    CACHE = cache
+
+
+def is_empty(value):
+    """Failed fetches come back as None, [] or an empty DataFrame"""
+    if value is None:
+        return True
+    if hasattr(value, "empty"):
+        return value.empty
+    try:
+        return len(value) == 0
+    except TypeError:
+        return False
+
+
+def make_key(func, args, kwargs):
+    return (func.__module__, func.__qualname__, args, tuple(sorted(kwargs.items())))
+
+
+def fingerprint(value):
+    """Short content hash of a fetch result (DataFrame, dict, list, ...)"""
+    if hasattr(value, "to_json"):
+        payload = value.to_json(orient="split", date_format="iso")
+    else:
+        payload = json.dumps(value, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def cached(source, ttl, cache=None, flights=FLIGHTS, lease=30):
+    """Cache a fetch helper's result for ttl seconds, keyed on its arguments.
+
+    Empty results are not cached, so a failed upstream call is retried on
+    the next refresh instead of blanking the card for a whole window.
+    Concurrent misses for one key share a single upstream call; with a
+    shared backend, a lease (held for at most lease seconds) makes the
+    other processes wait for that call too.
+
+    Hits, misses and the latency of every upstream call are recorded in
+    metrics.py under the source's name.
+    """
+    def decorator(func):
+        def fetch(args, kwargs):
+            started = time.perf_counter()
+            value = None
+            try:
+                value = func(*args, **kwargs)
+                return value
+            finally:
+                FETCH_SECONDS.observe(time.perf_counter() - started, source)
+                if is_empty(value):
+                    FETCH_ERRORS.inc(source)
+
+        def load(key, args, kwargs, max_age=None, recheck=True):
+            backend = cache if cache is not None else CACHE
+            if recheck:
+                value = backend.get(key, _MISSING, max_age=max_age)
+                if value is not _MISSING:
+                    CACHE_REQUESTS.inc(source, "hit")
+                    return value
+            CACHE_REQUESTS.inc(source, "miss")
+            deadline = time.monotonic() + lease
+            while not (acquired := backend.acquire(key, lease)):
+                # Another process is fetching this key; wait for its result
+                time.sleep(0.05)
+                value = backend.get(key, _MISSING, max_age=max_age)
+                if value is not _MISSING:
+                    return value
+                if time.monotonic() > deadline:
+                    break
+            try:
+                if acquired:
+                    # The previous holder may have stored the value just before releasing
+                    value = backend.get(key, _MISSING, max_age=max_age)
+                    if value is not _MISSING:
+                        return value
+                value = fetch(args, kwargs)
+                if not is_empty(value):
+                    backend.set(key, value, ttl)
+                return value
+            finally:
+                # A waiter that gave up fetches without the lease and must not free it
+                if acquired:
+                    backend.release(key)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = make_key(func, args, kwargs)
+            value = (cache if cache is not None else CACHE).get(key, _MISSING)
+            if value is not _MISSING:
+                CACHE_REQUESTS.inc(source, "hit")
+                return value
+            return flights.do(key, lambda: load(key, args, kwargs, recheck=False))
+
+        def refresh(*args, **kwargs):
+            """Fetch upstream now unless the entry was stored within half a window.
+
+            The exception lets workers whose pollers tick together reuse the
+            fetch that one of them just made.
+            """
+            key = make_key(func, args, kwargs)
+            return flights.do(key, lambda: load(key, args, kwargs, max_age=ttl / 2))
+
+        wrapper.refresh = refresh
+        wrapper.source = source
+        wrapper.ttl = ttl
+        return wrapper
+    return decorator
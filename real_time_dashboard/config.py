@@ -0,0 +1,70 @@
+"""
+Deployment settings, read from DASHBOARD_* environment variables.
+
+``python -m real_time_dashboard`` (see __main__.py) sets these from its
+command-line flags before app.py is imported, so the dev server and
+every gunicorn worker see the same values without code edits.
+
+    DASHBOARD_ENV          "production" turns on production mode
+    DASHBOARD_REFRESH      per-source refresh periods, "stock=30,news=600"
+    DASHBOARD_CACHE_URL    fetch cache backend (memory://, sqlite:///, redis://)
+    DASHBOARD_CACHE_SIZE   entries kept by the fetch cache
+    DASHBOARD_STOCK_TICKERS  tickers whose intraday bars are kept in memory
+    DASHBOARD_TICKER / DASHBOARD_COUNTRY / DASHBOARD_CITY  default card inputs
+    DASHBOARD_STATE_DIR    where snapshots and geocodes are persisted (default data/)
+    DASHBOARD_WORKERS      worker processes serving the app; per-host request
+                           budgets are split between them
+    DASHBOARD_PUSH_STREAMS /_push streams a worker holds open at once; later
+                           tabs poll instead (default: half of DASHBOARD_THREADS)
+    DASHBOARD_<NAME>_URL   base URL of an upstream API, e.g. DASHBOARD_COINGECKO_URL;
+                           bench/ points these at a local stub server
+"""
+
+import os
+
+DEFAULT_UPSTREAMS = {
+    "coingecko": "https://api.coingecko.com/api/v3",
+    "disease": "https://disease.sh/v3",
+    "geocoding": "https://geocoding-api.open-meteo.com/v1",
+    "forecast": "https://api.open-meteo.com/v1",
+    "hn": "https://hn.algolia.com/api/v1",
+}
+
+DEFAULT_REFRESH_SECONDS = {"stock": 60, "covid": 120, "weather": 180, "crypto": 60, "news": 300, "marketcap": 300}
+
+
+def parse_refresh(text, defaults=DEFAULT_REFRESH_SECONDS):
+    """'stock=30, news=600' -> the default periods with those two overridden"""
+    periods = dict(defaults)
+    for item in filter(None, (part.strip() for part in text.split(","))):
+        source, _, seconds = item.partition("=")
+        source = source.strip()
+        if source not in periods:
+            raise ValueError(f"Unknown source {source!r} in refresh periods; expected one of {', '.join(periods)}")
+        if not seconds.strip().isdigit() or int(seconds) <= 0:
+            raise ValueError(f"Refresh period for {source!r} must be a positive number of seconds")
+        periods[source] = int(seconds)
+    return periods
+
+
+PRODUCTION = os.environ.get("DASHBOARD_ENV") == "production"
+
+REFRESH_SECONDS = parse_refresh(os.environ.get("DASHBOARD_REFRESH", ""))
+
+CACHE_URL = os.environ.get("DASHBOARD_CACHE_URL", "memory://")
+CACHE_SIZE = int(os.environ.get("DASHBOARD_CACHE_SIZE", 256))
+STOCK_TICKERS = int(os.environ.get("DASHBOARD_STOCK_TICKERS", 64))
+
+DEFAULT_TICKER = os.environ.get("DASHBOARD_TICKER", "AAPL")
+DEFAULT_COUNTRY = os.environ.get("DASHBOARD_COUNTRY", "India")
+DEFAULT_CITY = os.environ.get("DASHBOARD_CITY", "New Delhi")
+
+WORKERS = max(1, int(os.environ.get("DASHBOARD_WORKERS", 1)))
+
+# Each /_push stream pins a worker thread; leave the other half for callbacks
+PUSH_STREAMS = int(os.environ.get("DASHBOARD_PUSH_STREAMS", int(os.environ.get("DASHBOARD_THREADS", 32)) // 2))
+
+STATE_DIR = os.environ.get("DASHBOARD_STATE_DIR") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+UPSTREAMS = {name: os.environ.get(f"DASHBOARD_{name.upper()}_URL", url).rstrip("/")
+             for name, url in DEFAULT_UPSTREAMS.items()}
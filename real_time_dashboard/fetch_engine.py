@@ -0,0 +1,38 @@
+"""
+asyncio fetch engine: run many fetch helpers concurrently.
+
+The fetch_* helpers stay plain functions on top of the shared pooled
+HTTP client (timeouts, retries and per-host stats included); the engine
+schedules them on an asyncio loop backed by a thread pool, so a refresh
+of N sources takes as long as the slowest one rather than the sum.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+
+class FetchEngine:
+    """Schedules blocking fetch calls concurrently on an asyncio event loop"""
+
+    def __init__(self, max_workers=16):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fetch")
+
+    async def fetch(self, func, *args):
+        """Await func(*args) without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args))
+
+    async def gather(self, calls):
+        """Await every (func, args) pair concurrently; exceptions are returned, not raised"""
+        return await asyncio.gather(*(self.fetch(func, *args) for func, args in calls), return_exceptions=True)
+
+    def run(self, calls):
+        """Run [(func, args), ...] concurrently from synchronous code, results in order"""
+        calls = list(calls)
+        if not calls:
+            return []
+        return asyncio.run(self.gather(calls))
+
+
+ENGINE = FetchEngine()
@@ -0,0 +1,74 @@
+"""
+City -> (latitude, longitude) cache for the weather card.
+
+A city's coordinates never change, so fetch_weather only needs the
+geocoding API the first time it sees a city. Lookups are kept in memory
+and, optionally, in a small JSON file under data/ so they survive
+restarts and are warm again as soon as the app starts.
+"""
+
+import json
+import os
+import tempfile
+import threading
+
+
+def normalize_city(city):
+    """'  new   DELHI ' and 'New Delhi' share one cache entry"""
+    return " ".join(str(city).split()).casefold()
+
+
+class GeocodeCache:
+    """In-memory city -> (lat, lon) map, optionally persisted as JSON"""
+
+    def __init__(self, path=None):
+        self.path = path
+        self._coords = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """Warm the cache from disk; a missing or corrupt file is ignored"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return
+        with self._lock:
+            for city, (lat, lon) in data.items():
+                self._coords[normalize_city(city)] = (lat, lon)
+
+    def get(self, city):
+        return self._coords.get(normalize_city(city))
+
+    def set(self, city, lat, lon):
+        with self._lock:
+            self._coords[normalize_city(city)] = (lat, lon)
+            snapshot = dict(self._coords)
+        self._save(snapshot)
+
+    def resolve(self, city, lookup):
+        """Return cached coordinates, calling lookup(city) -> (lat, lon) on a miss"""
+        coords = self.get(city)
+        if coords is None:
+            coords = lookup(city)
+            self.set(city, *coords)
+        return coords
+
+    def _save(self, snapshot):
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path) or "."
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(snapshot, fh, indent=1, sort_keys=True)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+    def __len__(self):
+        return len(self._coords)
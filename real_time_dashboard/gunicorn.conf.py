@@ -0,0 +1,29 @@
+"""
+gunicorn settings for the dashboard.
+
+Workers share the fetch cache through DASHBOARD_CACHE_URL, which defaults
+to a SQLite file in DASHBOARD_STATE_DIR (data/ here if unset), next to
+the snapshots; set it to redis://... to use Redis.
+Production mode (see production.py) is on by default.
+Threaded workers are needed so /_push server-sent-event streams don't
+tie up a whole worker each. Every open stream still pins one thread, so
+a worker holds at most DASHBOARD_PUSH_STREAMS of them (half its threads
+by default) and sends later tabs back to polling.
+"""
+
+import multiprocessing
+import os
+
+os.environ.setdefault("DASHBOARD_ENV", "production")
+
+_state = os.environ.get("DASHBOARD_STATE_DIR") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+os.environ.setdefault("DASHBOARD_CACHE_URL", f"sqlite:///{os.path.join(_state, 'cache.sqlite3')}")
+
+bind = os.environ.get("DASHBOARD_BIND", "0.0.0.0:8050")
+workers = int(os.environ.get("DASHBOARD_WORKERS", min(4, multiprocessing.cpu_count())))
+# Read by config.py in every worker, to split the upstream request budgets
+os.environ["DASHBOARD_WORKERS"] = str(workers)
+worker_class = "gthread"
+threads = int(os.environ.get("DASHBOARD_THREADS", 32))
+timeout = 60
+keepalive = 5
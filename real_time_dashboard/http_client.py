@@ -0,0 +1,117 @@
+"""
+Shared HTTP client for every upstream API the dashboard talks to.
+
+A single requests.Session keeps one keep-alive connection pool per host,
+applies connect/read timeouts to every call (so a hung upstream cannot pin
+a worker thread) and retries idempotent GETs a bounded number of times
+with exponential backoff on connection errors and 5xx responses. A 429
+is not retried: it fails the call at once, so the host's circuit
+breaker counts it and no requests go out while it is rate-limiting us.
+Per-host latency counters are kept in memory.
+Every call first goes through the host's circuit breaker (breaker.py) and
+then spends a token from the host's request budget (budget.py), so calls
+short-circuited by an open breaker cost no budget.
+"""
+
+import threading
+import time
+from contextlib import nullcontext
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from breaker import BREAKERS
+from budget import BUDGET
+
+
+class HostStats:
+    """Latency and error counters for one upstream host"""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def record(self, seconds, ok):
+        self.requests += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        if not ok:
+            self.errors += 1
+
+    def as_dict(self):
+        avg = self.total_seconds / self.requests if self.requests else 0.0
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "avg_ms": round(avg * 1000, 1),
+            "max_ms": round(self.max_seconds * 1000, 1),
+        }
+
+
+class HttpClient:
+    """Pooled, timeout-bound requests.Session with per-host stats, budgets and breakers"""
+
+    def __init__(self, connect_timeout=3.05, read_timeout=10, retries=2, backoff=0.5,
+                 pool_hosts=10, pool_size=10, budget=None,
+                 breakers=None):
+        self.timeout = (connect_timeout, read_timeout)
+        self.budget = budget
+        self.breakers = breakers
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset(["GET"]),
+            respect_retry_after_header=True,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_hosts, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def get(self, url, params=None, **kwargs):
+        """GET url with the client's timeouts and retries; raises on HTTP errors.
+
+        Raises BudgetExhausted or CircuitOpen without calling out if the host
+        is out of tokens or its breaker is open.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        host = urlsplit(url).netloc
+        if self.breakers is not None:
+            # Checks the breaker before spending a token
+            guard = self.breakers.guard(host, self.budget)
+        else:
+            if self.budget is not None:
+                self.budget.take(host)
+            guard = nullcontext()
+        with guard:
+            started = time.perf_counter()
+            ok = False
+            try:
+                response = self.session.get(url, params=params, **kwargs)
+                response.raise_for_status()
+                ok = True
+                return response
+            finally:
+                self._record(host, time.perf_counter() - started, ok)
+
+    def get_json(self, url, params=None, **kwargs):
+        return self.get(url, params=params, **kwargs).json()
+
+    def _record(self, host, seconds, ok):
+        with self._lock:
+            self._stats.setdefault(host, HostStats()).record(seconds, ok)
+
+    def stats(self):
+        """Snapshot of the per-host counters, e.g. {"api.coingecko.com": {...}}"""
+        with self._lock:
+            return {host: s.as_dict() for host, s in self._stats.items()}
+
+
+HTTP = HttpClient(budget=BUDGET, breakers=BREAKERS)
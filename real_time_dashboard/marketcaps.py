@@ -0,0 +1,113 @@
+"""
+Live market caps for a configurable universe of tickers.
+
+The universe is a CSV (ticker, company, optional market_cap in USD). The
+optional column seeds the ranking, so the card has something to show
+offline or before the first refresh.
+
+A refresh prices the whole universe -- plus any FX pairs needed for
+non-USD listings -- with one batched yf.download; share counts change
+rarely and are looked up per ticker only once a day. Those lookups cost a
+Yahoo call each and share the stock card's request budget, so a refresh
+makes at most ``lookups_per_refresh`` of them, largest companies first;
+a large universe is filled in over several refreshes. Each new cap is fed
+into a TopN heap, so re-ranking touches only the caps that moved.
+"""
+
+import csv
+import threading
+import time
+
+import pandas as pd
+import yfinance as yf
+
+from breaker import BREAKERS
+from budget import BUDGET, YAHOO, BudgetExhausted
+from fetch_engine import FetchEngine
+from ranking import TopN
+
+
+def load_universe(path):
+    """Return ({ticker: company}, {ticker: seed market cap in USD})"""
+    names, seeds = {}, {}
+    with open(path, newline="", encoding="utf-8") as fh:
+        for row in csv.DictReader(fh):
+            ticker = row["ticker"].strip().upper()
+            names[ticker] = (row.get("company") or ticker).strip()
+            if (row.get("market_cap") or "").strip():
+                seeds[ticker] = float(row["market_cap"])
+    return names, seeds
+
+
+def fetch_share_info(ticker):
+    """(shares outstanding, quote currency) for one ticker"""
+    with BREAKERS.guard(YAHOO, budget=BUDGET):
+        info = yf.Ticker(ticker).fast_info
+        return info["shares"], info["currency"]
+
+
+def download_closes(symbols):
+    """{symbol: latest close} for every symbol, in one batched download"""
+    BREAKERS.before(YAHOO, budget=BUDGET)
+    data = yf.download(list(symbols), period="5d", interval="1d", auto_adjust=False, multi_level_index=True,
+                       progress=False)
+    # yfinance logs network errors and returns an empty frame instead of raising
+    BREAKERS.record(YAHOO, data is not None and not data.empty)
+    if data is None or data.empty:
+        return {}
+    closes = data["Close"].ffill().iloc[-1]
+    return {symbol: float(price) for symbol, price in closes.items() if pd.notna(price)}
+
+
+class MarketCapFeed:
+    """Keeps a TopN ranking of the universe's market caps up to date"""
+
+    def __init__(self, names, seeds=None, shares_ttl=24 * 3600, retry_after=900, lookups_per_refresh=20,
+                 max_workers=8):
+        self.names = names
+        self.shares_ttl = shares_ttl
+        self.retry_after = retry_after
+        self.lookups_per_refresh = lookups_per_refresh
+        self.ranking = TopN()
+        for ticker, cap in (seeds or {}).items():
+            self.ranking.update(ticker, cap)
+        # ticker -> (shares, currency, fetched_at); shares is None after a failed lookup
+        self._shares = {}
+        self._engine = FetchEngine(max_workers=max_workers)
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Re-price the universe and update the ranking for caps that changed"""
+        with self._lock:
+            self._refresh_shares()
+            listed = {t: (shares, currency) for t, (shares, currency, _) in self._shares.items() if shares}
+            fx = {c: f"{c}USD=X" for _, c in listed.values() if c and c != "USD"}
+            closes = download_closes(list(listed) + list(fx.values()))
+            for ticker, (shares, currency) in listed.items():
+                price = closes.get(ticker)
+                rate = closes.get(fx[currency]) if currency in fx else 1.0
+                if price is not None and rate is not None:
+                    self.ranking.update(ticker, price * shares * rate)
+
+    def _refresh_shares(self):
+        now = time.time()
+        due = []
+        for ticker in self.names:
+            shares, _, fetched_at = self._shares.get(ticker, (None, None, 0.0))
+            if now - fetched_at > (self.shares_ttl if shares else self.retry_after):
+                due.append((fetched_at, -self.ranking.get(ticker, 0.0), ticker))
+        # Never looked up first, then the longest ago; the largest companies first within each
+        due = [ticker for _, _, ticker in sorted(due)[:self.lookups_per_refresh]]
+        results = self._engine.run((fetch_share_info, (ticker,)) for ticker in due)
+        for ticker, result in zip(due, results):
+            if isinstance(result, BudgetExhausted):
+                continue  # not a failed lookup: try again next refresh
+            if isinstance(result, Exception):
+                self._shares[ticker] = (None, None, now)
+            else:
+                self._shares[ticker] = (result[0], result[1], now)
+
+    def top(self, n):
+        """The n largest companies as a frame: Company, MarketCap (trillions USD)"""
+        rows = [(self.names.get(t, t), cap / 1e12) for t, cap in self.ranking.top(n)]
+        return pd.DataFrame(rows, columns=["Company", "MarketCap"])
@@ -0,0 +1,195 @@
+"""
+Hot-path instrumentation, served in Prometheus text format on /metrics.
+
+- dashboard_callback_seconds / _errors_total: every update_* callback
+- dashboard_fetch_seconds / _errors_total: every upstream fetch made by a
+  fetch_* helper (cache hits are not fetches)
+- dashboard_cache_requests_total: fetch-cache hits and misses per source
+- dashboard_response_bytes: callback response payload size, before compression
+- dashboard_serialization_seconds: time spent outside the callback body in
+  /_dash-update-component, which is mostly figure-to-JSON serialization
+
+Metrics are kept per process; with several gunicorn workers each worker
+serves its own, and Prometheus sums them across scrape targets.
+"""
+
+import threading
+import time
+from functools import wraps
+
+from flask import Response, g, has_request_context, request
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+SIZE_BUCKETS = (1e3, 5e3, 1e4, 5e4, 1e5, 2.5e5, 5e5, 1e6, 5e6)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values):
+    """'{source="crypto",result="hit"}', or '' for an unlabelled metric"""
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+class Counter:
+    """Monotonic count per label set"""
+
+    kind = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for labels, value in sorted(values.items()):
+            yield f"{self.name}{_labels(self.labelnames, labels)} {value}"
+
+
+class Histogram:
+    """Cumulative bucket counts, sum and count per label set"""
+
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._values = {}  # labels -> [per-bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        with self._lock:
+            counts = self._values.get(labels)
+            if counts is None:
+                counts = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            counts[-2] += 1
+            counts[-1] += value
+
+    def samples(self):
+        with self._lock:
+            values = {labels: list(counts) for labels, counts in self._values.items()}
+        names = self.labelnames + ("le",)
+        for labels, counts in sorted(values.items()):
+            for bound, count in zip(self.buckets, counts):
+                yield f"{self.name}_bucket{_labels(names, labels + (f'{bound:g}',))} {count}"
+            yield f"{self.name}_bucket{_labels(names, labels + ('+Inf',))} {counts[-2]}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {counts[-1]:.6f}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {counts[-2]}"
+
+
+class Gauge:
+    """Values read from a callback at scrape time: fn() -> {labels: value}"""
+
+    kind = "gauge"
+
+    def __init__(self, name, help, labelnames, fn):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.fn = fn
+
+    def samples(self):
+        for labels, value in sorted(self.fn().items()):
+            yield f"{self.name}{_labels(self.labelnames, labels)} {value}"
+
+
+class Registry:
+    """The metrics exposed on /metrics"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self.add(Counter(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self.add(Histogram(name, help, labelnames, buckets))
+
+    def gauge(self, name, help, labelnames, fn):
+        return self.add(Gauge(name, help, labelnames, fn))
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Registry()
+
+CALLBACK_SECONDS = METRICS.histogram("dashboard_callback_seconds", "Time spent in a Dash callback", ["callback"])
+CALLBACK_ERRORS = METRICS.counter("dashboard_callback_errors_total", "Dash callbacks that raised", ["callback"])
+FETCH_SECONDS = METRICS.histogram("dashboard_fetch_seconds", "Time spent fetching a source upstream", ["source"])
+FETCH_ERRORS = METRICS.counter("dashboard_fetch_errors_total", "Upstream fetches that failed or came back empty",
+                               ["source"])
+CACHE_REQUESTS = METRICS.counter("dashboard_cache_requests_total", "Fetch-cache lookups", ["source", "result"])
+RESPONSE_BYTES = METRICS.histogram("dashboard_response_bytes", "Callback response payload size (uncompressed)",
+                                   ["callback"], buckets=SIZE_BUCKETS)
+SERIALIZE_SECONDS = METRICS.histogram("dashboard_serialization_seconds",
+                                      "Callback request time spent outside the callback body", ["callback"])
+
+
+def timed_callback(name):
+    """Record a Dash callback's latency and errors; goes under @app.callback"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                CALLBACK_ERRORS.inc(name)
+                raise
+            finally:
+                elapsed = time.perf_counter() - started
+                CALLBACK_SECONDS.observe(elapsed, name)
+                if has_request_context():
+                    g.metrics_callback = name
+                    g.metrics_callback_seconds = g.get("metrics_callback_seconds", 0.0) + elapsed
+        return wrapper
+    return decorator
+
+
+def register_metrics(server, registry=METRICS, path="/metrics", callback_path="/_dash-update-component"):
+    """Add the /metrics route and time callback requests end to end"""
+
+    @server.before_request
+    def start_timer():
+        g.metrics_started = time.perf_counter()
+
+    @server.after_request
+    def record_callback_request(response):
+        name = g.get("metrics_callback")
+        if name is not None and request.path.endswith(callback_path):
+            total = time.perf_counter() - g.metrics_started
+            SERIALIZE_SECONDS.observe(max(0.0, total - g.metrics_callback_seconds), name)
+            if not response.direct_passthrough:
+                RESPONSE_BYTES.observe(len(response.get_data()), name)
+        return response
+
+    @server.route(path)
+    def metrics():
+        return Response(registry.render(), mimetype="text/plain; version=0.0.4")
@@ -0,0 +1,303 @@
+"""
+Background poller that keeps an in-memory snapshot of every data source.
+
+Each registered source gets a daemon thread that re-fetches it on its own
+cadence. Dash callbacks read the latest snapshot through ``Poller.latest``
+instead of calling the network, so callback latency no longer depends on
+upstream latency.
+
+Sources are parameterised (ticker, country, city): the poller keeps
+refreshing every argument tuple a viewer asked for recently, plus the
+layout defaults, and forgets the rest once nobody has requested them for
+a few refresh windows. Refreshes go through the asyncio fetch engine, so
+all watched arguments of a source -- and, at start-up, all sources -- are
+fetched concurrently.
+
+Snapshots are served stale-while-revalidate: a failed or empty refresh
+never replaces the last good snapshot, and a snapshot older than its
+refresh window is served immediately while a background revalidation
+is started.
+
+Every source carries a version number that is bumped when a refresh
+actually changes its snapshots -- once per refresh of the source, however
+many of its watched argument tuples changed, so a push-driven tab re-runs
+its card once per window rather than once per distinct input being
+watched. A first fetch of new arguments doesn't bump it: only the viewer
+who asked has them. ``wait_for_change`` lets the push channel block until
+a version changes. A source's ``on_change`` hook is called
+with each new snapshot value, in every process, whether the value came
+from the upstream or from a shared cache.
+
+With a snapshot store attached, changed snapshots are also written to
+disk and ``restore`` loads the recent ones back at start-up. Keys nobody
+has asked for in ``idle_windows`` refresh periods are pruned from it.
+"""
+
+import threading
+import time
+from collections import namedtuple
+
+from cache import is_empty
+from fetch_engine import ENGINE
+
+_MISSING = object()
+
+
+def _same(a, b):
+    if hasattr(a, "equals") and type(a) is type(b):
+        return a.equals(b)
+    try:
+        return bool(a == b)
+    except (TypeError, ValueError):
+        return False
+
+
+# fetched_at is wall-clock (time.time()) so it can be shown to viewers
+Snapshot = namedtuple("Snapshot", ["value", "fetched_at", "stale"])
+
+
+class _Source:
+    def __init__(self, name, func, interval, defaults, on_change=None):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.on_change = on_change
+        self.pinned = set(defaults)
+        # args -> monotonic time it was last requested by a callback
+        self.watched = {args: time.monotonic() for args in self.pinned}
+
+
+class Poller:
+    """Refreshes registered sources in the background and serves snapshots"""
+
+    def __init__(self, idle_windows=3, engine=ENGINE, warmup_timeout=15, store=None):
+        self.idle_windows = idle_windows
+        self.engine = engine
+        self.store = store
+        self.warmup_timeout = warmup_timeout
+        self._sources = {}
+        # (name, args) -> (value, fetched_at)
+        self._snapshots = {}
+        self._revalidating = set()
+        self._versions = {}
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._stop = threading.Event()
+        self._warm = threading.Event()
+        self._threads = []
+
+    def register(self, name, func, interval, defaults=((),), on_change=None):
+        """Poll func every interval seconds for each argument tuple in defaults.
+
+        on_change(value) is called whenever a refresh changes a snapshot.
+        """
+        self._sources[name] = _Source(name, func, interval, defaults, on_change)
+        self._versions[name] = 0
+
+    def latest(self, name, *args):
+        """Return the latest snapshot value for (name, args)"""
+        return self.snapshot(name, *args).value
+
+    def snapshot(self, name, *args):
+        """Return the latest Snapshot for (name, args).
+
+        The first request for an argument tuple the poller has never seen is
+        fetched synchronously; from then on it is refreshed in the background
+        and served from memory, even while stale.
+        """
+        source = self._sources[name]
+        key = (name, args)
+        with self._lock:
+            source.watched[args] = time.monotonic()
+            entry = self._snapshots.get(key, _MISSING)
+        if entry is _MISSING and args in source.pinned and self._threads:
+            # The start-up warm-up is already fetching this one
+            self._warm.wait(self.warmup_timeout)
+            entry = self._snapshots.get(key, _MISSING)
+        if entry is _MISSING:
+            self._fetch(source, args)
+            entry = self._snapshots[key]
+        value, fetched_at = entry
+        stale = time.time() - fetched_at > source.interval
+        if stale:
+            self._revalidate(source, args)
+        return Snapshot(value, fetched_at, stale)
+
+    def refresh(self, *names):
+        """Re-fetch every watched argument tuple of the given sources concurrently"""
+        calls, owners = [], []
+        for name in names:
+            source = self._sources[name]
+            for args in self._expire(source):
+                calls.append((self._fetch, (source, args, False)))
+                owners.append(name)
+        results = self.engine.run(calls)
+        self._bump({name for name, changed in zip(owners, results) if changed is True})
+
+    def _bump(self, names):
+        """New versions for the given sources, waking the push streams once"""
+        if not names:
+            return
+        with self._lock:
+            for name in names:
+                self._versions[name] += 1
+            self._changed.notify_all()
+
+    def refresh_all(self):
+        """Re-fetch every source at once; takes as long as the slowest one"""
+        self.refresh(*self._sources)
+
+    def _expire(self, source):
+        """Forget idle argument tuples and return the ones still watched"""
+        cutoff = time.monotonic() - source.interval * self.idle_windows
+        forgotten = False
+        with self._lock:
+            for args, seen in list(source.watched.items()):
+                if seen < cutoff and args not in source.pinned:
+                    del source.watched[args]
+                    forgotten = True
+            # Restored snapshots nobody has asked for go once they are as old as an idle key
+            oldest = time.time() - source.interval * self.idle_windows
+            for key, (_, fetched_at) in list(self._snapshots.items()):
+                if key[0] == source.name and key[1] not in source.watched and fetched_at < oldest:
+                    del self._snapshots[key]
+            watched = list(source.watched)
+        if forgotten:
+            self._prune(source)
+        return watched
+
+    def _prune(self, source):
+        """Drop stored keys not saved within idle_windows refresh periods (pinned ones stay)"""
+        if self.store is None:
+            return
+        try:
+            self.store.prune(source.name, time.time() - source.interval * self.idle_windows, keep=source.pinned)
+        except Exception:
+            pass
+
+    def _fetch(self, source, args, notify=True):
+        """Fetch (source, args) into its snapshot; True if an existing snapshot changed.
+
+        With notify, such a change bumps the source's version at once;
+        refresh() passes False and bumps once for the whole batch.
+        """
+        fetch = getattr(source.func, "refresh", source.func)
+        try:
+            value = fetch(*args)
+        except Exception:
+            value = None
+        key = (source.name, args)
+        fetched_at = time.time()
+        changed = False
+        with self._lock:
+            previous = self._snapshots.get(key, _MISSING)
+            # Keep serving the last good snapshot when a refresh fails
+            if not is_empty(value) or previous is _MISSING:
+                self._snapshots[key] = (value, fetched_at)
+                changed = previous is _MISSING or not _same(previous[0], value)
+        if changed and source.on_change is not None and not is_empty(value):
+            try:
+                source.on_change(value)
+            except Exception:
+                pass
+        if changed and self.store is not None and not is_empty(value):
+            try:
+                self.store.save(source.name, args, value, fetched_at)
+            except Exception:
+                pass
+        updated = changed and previous is not _MISSING
+        if updated and notify:
+            self._bump({source.name})
+        return updated
+
+    def restore(self):
+        """Load the latest stored snapshots of the registered sources from disk.
+
+        Only pinned keys and keys saved within idle_windows refresh periods
+        are loaded; older ones are pruned from the store. Restored keys are
+        not marked watched, so the warm-up doesn't re-fetch them: they keep
+        their original age and are revalidated on first use, or dropped once
+        they are idle_windows refresh periods old if nobody asks. Returns the
+        number restored.
+        """
+        if self.store is None:
+            return 0
+        for source in self._sources.values():
+            self._prune(source)
+        now = time.time()
+        restored = 0
+        for name, args, value, fetched_at in self.store.latest():
+            source = self._sources.get(name)
+            if source is None:
+                continue
+            if args not in source.pinned and now - fetched_at > source.interval * self.idle_windows:
+                continue
+            with self._lock:
+                if (name, args) not in self._snapshots:
+                    self._snapshots[(name, args)] = (value, fetched_at)
+                    restored += 1
+        return restored
+
+    def versions(self):
+        """{source: version}; a version changes only when the data does"""
+        with self._lock:
+            return dict(self._versions)
+
+    def wait_for_change(self, seen, timeout=None):
+        """Block until some source's version differs from seen (or timeout)"""
+        with self._changed:
+            self._changed.wait_for(lambda: self._versions != seen, timeout)
+            return dict(self._versions)
+
+    def _revalidate(self, source, args):
+        """Refresh (source, args) in the background unless already under way"""
+        key = (source.name, args)
+        with self._lock:
+            if key in self._revalidating:
+                return
+            self._revalidating.add(key)
+
+        def run():
+            try:
+                self._fetch(source, args)
+            finally:
+                with self._lock:
+                    self._revalidating.discard(key)
+
+        threading.Thread(target=run, name=f"revalidate-{source.name}", daemon=True).start()
+
+    def _run(self, name):
+        interval = self._sources[name].interval
+        self._warm.wait()
+        # Ticks are aligned to wall-clock multiples of the interval, so the
+        # pollers of separate worker processes refresh together and can share
+        # one upstream fetch through a shared cache backend.
+        while not self._stop.wait(interval - time.time() % interval):
+            try:
+                self.refresh(name)
+            except Exception:
+                pass
+
+    def _warmup(self):
+        try:
+            self.refresh_all()
+        finally:
+            self._warm.set()
+
+    def start(self):
+        """Warm every source concurrently, then start one daemon thread per source.
+
+        Safe to call repeatedly.
+        """
+        with self._lock:
+            if self._threads:
+                return
+            self._threads.append(threading.Thread(target=self._warmup, name="poller-warmup", daemon=True))
+            for name in self._sources:
+                thread = threading.Thread(target=self._run, args=(name,), name=f"poller-{name}", daemon=True)
+                self._threads.append(thread)
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        self._stop.set()
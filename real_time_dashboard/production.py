@@ -0,0 +1,30 @@
+"""
+Production settings for the Flask server behind the dashboard.
+
+- Responses are compressed (brotli when available, else gzip) through
+  the optional ``flask-compress`` package. Callback JSON for the figures
+  shrinks several times over. text/event-stream is not in the compressed
+  mimetypes, so the /_push stream is still flushed message by message.
+- Files under assets/ get a long Cache-Control max-age. Dash links them
+  with a ``?m=<mtime>`` query string, so a changed file gets a new URL.
+  Dash's component bundles are already fingerprinted and cached for a year.
+"""
+
+try:
+    from flask_compress import Compress
+except ImportError:  # optional: pip install flask-compress
+    Compress = None
+
+COMPRESS_MIMETYPES = ["text/html", "text/css", "application/javascript", "application/json"]
+
+
+def configure_production(server, asset_max_age=365 * 24 * 3600):
+    """Enable response compression and long-lived asset caching on a Flask server"""
+    server.config["SEND_FILE_MAX_AGE_DEFAULT"] = asset_max_age
+    if Compress is None:
+        server.logger.warning("flask-compress is not installed; responses are sent uncompressed")
+        return False
+    server.config.setdefault("COMPRESS_MIMETYPES", COMPRESS_MIMETYPES)
+    server.config.setdefault("COMPRESS_ALGORITHM", ["br", "gzip"])
+    Compress(server)
+    return True
@@ -0,0 +1,89 @@
+"""
+Server-Sent Events channel that tells browsers when a source has changed.
+
+Instead of every tab polling every card on a timer, each tab keeps one
+EventSource connection open to ``/_push``. The server sends a message
+only when the poller's version for a source changes; assets/push.js then
+bumps the matching ``push-<source>`` dcc.Store, which triggers that
+card's callback. Request volume scales with data changes, not with
+viewers x intervals.
+
+Each open stream holds one server thread (gthread worker or Flask's
+threaded server), so a worker accepts at most ``max_streams`` of them and
+answers the rest with 503; push.js then falls back to timer polling.
+Keep max_streams well below the worker's thread count so callbacks
+always have threads left.
+
+Every message carries the versions it reflects as its event id, and a
+new stream opens with an id-only event, which sets the browser's
+Last-Event-ID without triggering anything (the page load has just
+rendered every card). When the EventSource reconnects, it sends that id
+back. On the same process, only the sources that changed since are sent.
+On another worker, every source's current version is sent, so the tab
+catches up on whatever it missed while away.
+"""
+
+import json
+import os
+import threading
+
+from flask import Response, request, stream_with_context
+
+
+def event_id(versions):
+    """'<pid>:stock=3,covid=1,...': the versions a client has seen, scoped to this process"""
+    return f"{os.getpid()}:" + ",".join(f"{name}={version}" for name, version in versions.items())
+
+
+def parse_event_id(text):
+    """Versions from a Last-Event-ID: None without one, {} (send everything) if another process wrote it"""
+    if not text:
+        return None
+    pid, _, pairs = text.partition(":")
+    if pid != str(os.getpid()):
+        return {}
+    seen = {}
+    for pair in filter(None, pairs.split(",")):
+        name, _, version = pair.partition("=")
+        if version.isdigit():
+            seen[name] = int(version)
+    return seen
+
+
+def register_push(server, poller, path="/_push", heartbeat=15, max_streams=16):
+    """Add the SSE endpoint for poller's version changes to a Flask server"""
+    slots = threading.BoundedSemaphore(max_streams)
+
+    @server.route(path)
+    def push_stream():
+        if not slots.acquire(blocking=False):
+            return Response("too many push streams\n", status=503, headers={"Retry-After": "60"},
+                            mimetype="text/plain")
+        seen = parse_event_id(request.headers.get("Last-Event-ID"))
+
+        def stream(seen):
+            yield "retry: 5000\n\n"
+            current = poller.versions()
+            if seen is None:
+                yield f"id: {event_id(current)}\n\n"
+                seen = current
+                current = poller.wait_for_change(seen, timeout=heartbeat)
+            while True:
+                changed = [name for name, version in current.items() if version != seen.get(name)]
+                if not changed:
+                    # Comment line: keeps proxies from closing an idle stream
+                    yield ": keep-alive\n\n"
+                for name in changed:
+                    # The pid makes versions from different workers distinct
+                    version = f"{os.getpid()}-{current[name]}"
+                    yield f"id: {event_id(current)}\ndata: {json.dumps({'source': name, 'version': version})}\n\n"
+                seen = current
+                current = poller.wait_for_change(seen, timeout=heartbeat)
+
+        headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        response = Response(stream_with_context(stream(seen)), mimetype="text/event-stream", headers=headers)
+        # Runs when the server closes the response, i.e. the client has gone
+        response.call_on_close(slots.release)
+        return response
+
+    return push_stream
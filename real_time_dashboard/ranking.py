@@ -0,0 +1,62 @@
+"""
+Incrementally maintained top-N ranking.
+
+Values are kept in a dict and mirrored into a max-heap. An update pushes
+a new heap entry instead of re-sorting the universe; entries that no
+longer match the current value are discarded lazily when they surface,
+and the heap is compacted once stale entries outnumber live ones.
+"""
+
+import heapq
+import threading
+
+
+class TopN:
+    """Ranking of keys by value, cheap to update one key at a time"""
+
+    def __init__(self):
+        self._values = {}
+        self._heap = []
+        self._lock = threading.Lock()
+
+    def update(self, key, value):
+        """Set key's value; O(log n)"""
+        with self._lock:
+            if self._values.get(key) == value:
+                return
+            self._values[key] = value
+            heapq.heappush(self._heap, (-value, key))
+            if len(self._heap) > 2 * len(self._values) + 64:
+                self._compact()
+
+    def get(self, key, default=None):
+        with self._lock:
+            return self._values.get(key, default)
+
+    def remove(self, key):
+        with self._lock:
+            self._values.pop(key, None)
+
+    def top(self, n):
+        """[(key, value), ...] for the n largest values, largest first"""
+        with self._lock:
+            found, seen = [], set()
+            while self._heap and len(found) < n:
+                neg, key = heapq.heappop(self._heap)
+                if key in seen or self._values.get(key) != -neg:
+                    continue  # stale or duplicate entry: drop it for good
+                seen.add(key)
+                found.append((neg, key))
+            for entry in found:
+                heapq.heappush(self._heap, entry)
+            return [(key, -neg) for neg, key in found]
+
+    def _compact(self):
+        self._heap = [(-value, key) for key, value in self._values.items()]
+        heapq.heapify(self._heap)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __contains__(self, key):
+        return key in self._values
@@ -0,0 +1,199 @@
+"""
+Cache backends shared by several worker processes.
+
+Under gunicorn each worker is a separate process with its own memory, so
+the in-process TTLCache would be duplicated N times and so would every
+upstream call. These backends keep the fetch cache in one place instead:
+
+- ``SQLiteCache``: a WAL-mode SQLite file, no extra service needed.
+- ``RedisCache``: a Redis server (needs the optional ``redis`` package).
+
+Both implement the TTLCache interface used by ``cache.cached`` plus a
+fetch lease (acquire/release), so only one worker fetches a given key
+while the others wait for its result.
+"""
+
+import os
+import pickle
+import sqlite3
+import time
+from contextlib import closing
+
+from cache import TTLCache
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key       TEXT PRIMARY KEY,
+    expires   REAL NOT NULL,
+    stored_at REAL NOT NULL,
+    value     BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS leases (
+    key     TEXT PRIMARY KEY,
+    expires REAL NOT NULL,
+    token   TEXT NOT NULL
+);
+"""
+
+
+class SQLiteCache:
+    """TTL cache plus fetch leases in a SQLite file shared by all workers"""
+
+    def __init__(self, path, maxsize=1024):
+        self.path = path
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        # Leases are only released by the worker that took them
+        self._tokens = {}
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._init_db()
+
+    def _init_db(self):
+        # Workers start together; switching to WAL can briefly hit "locked"
+        for attempt in range(20):
+            try:
+                with closing(self._connect()) as db:
+                    if db.execute("PRAGMA journal_mode").fetchone()[0] != "wal":
+                        db.execute("PRAGMA journal_mode=WAL")
+                    columns = [row[1] for row in db.execute("PRAGMA table_info(leases)")]
+                    if columns and "token" not in columns:
+                        # Leases only live for seconds; recreate the table from before tokens
+                        db.execute("DROP TABLE leases")
+                    db.executescript(SCHEMA)
+                return
+            except sqlite3.OperationalError:
+                if attempt == 19:
+                    raise
+                time.sleep(0.1)
+
+    def _connect(self):
+        # One short-lived connection per operation: safe across threads and fork
+        db = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def get(self, key, default=None, max_age=None):
+        now = time.time()
+        with closing(self._connect()) as db:
+            row = db.execute("SELECT expires, stored_at, value FROM cache WHERE key = ?", (repr(key),)).fetchone()
+        if row is None or row[0] <= now or (max_age is not None and now - row[1] > max_age):
+            self.misses += 1
+            return default
+        try:
+            value = pickle.loads(row[2])
+        except Exception:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def set(self, key, value, ttl):
+        now = time.time()
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with closing(self._connect()) as db:
+            db.execute("BEGIN IMMEDIATE")
+            db.execute("INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)", (repr(key), now + ttl, now, payload))
+            db.execute("DELETE FROM cache WHERE expires <= ?", (now,))
+            db.execute(
+                "DELETE FROM cache WHERE key IN ("
+                "  SELECT key FROM cache ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                (self.maxsize,),
+            )
+            db.execute("COMMIT")
+
+    def acquire(self, key, ttl):
+        """Take the fetch lease for key unless another worker holds a live one"""
+        now = time.time()
+        token = os.urandom(8).hex()
+        with closing(self._connect()) as db:
+            db.execute("BEGIN IMMEDIATE")
+            db.execute("DELETE FROM leases WHERE key = ? AND expires <= ?", (repr(key), now))
+            taken = db.execute("INSERT OR IGNORE INTO leases VALUES (?, ?, ?)",
+                               (repr(key), now + ttl, token)).rowcount
+            db.execute("COMMIT")
+        if taken == 1:
+            self._tokens[key] = token
+        return taken == 1
+
+    def release(self, key):
+        token = self._tokens.pop(key, None)
+        if token is None:
+            return
+        with closing(self._connect()) as db:
+            db.execute("DELETE FROM leases WHERE key = ? AND token = ?", (repr(key), token))
+
+    def clear(self):
+        with closing(self._connect()) as db:
+            db.execute("DELETE FROM cache")
+            db.execute("DELETE FROM leases")
+
+    def __len__(self):
+        with closing(self._connect()) as db:
+            return db.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+
+class RedisCache:
+    """TTL cache plus fetch leases in Redis; keys expire server-side"""
+
+    def __init__(self, url, prefix="dashboard:"):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+        # Leases are only released by the worker that took them
+        self._tokens = {}
+
+    def _key(self, key):
+        return f"{self.prefix}cache:{key!r}"
+
+    def get(self, key, default=None, max_age=None):
+        raw = self.client.get(self._key(key))
+        if raw is None:
+            self.misses += 1
+            return default
+        stored_at, value = pickle.loads(raw)
+        if max_age is not None and time.time() - stored_at > max_age:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def set(self, key, value, ttl):
+        payload = pickle.dumps((time.time(), value), protocol=pickle.HIGHEST_PROTOCOL)
+        self.client.set(self._key(key), payload, px=int(ttl * 1000))
+
+    def acquire(self, key, ttl):
+        token = os.urandom(8).hex()
+        if self.client.set(f"{self.prefix}lease:{key!r}", token, nx=True, px=int(ttl * 1000)):
+            self._tokens[key] = token
+            return True
+        return False
+
+    def release(self, key):
+        token = self._tokens.pop(key, None)
+        name = f"{self.prefix}lease:{key!r}"
+        if token is not None and self.client.get(name) == token.encode():
+            self.client.delete(name)
+
+    def clear(self):
+        for name in self.client.scan_iter(f"{self.prefix}*"):
+            self.client.delete(name)
+
+
+def cache_from_url(url, maxsize=256):
+    """Build a cache backend from a URL.
+
+    ``memory://`` (or empty) -> in-process TTLCache
+    ``sqlite:///path/to/cache.sqlite3`` -> SQLiteCache
+    ``redis://host:6379/0`` -> RedisCache
+    """
+    if not url or url.startswith("memory://"):
+        return TTLCache(maxsize=maxsize)
+    if url.startswith("sqlite:///"):
+        return SQLiteCache(url[len("sqlite:///"):], maxsize=maxsize)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisCache(url)
+    raise ValueError(f"Unsupported cache URL: {url}")
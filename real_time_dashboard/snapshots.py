@@ -0,0 +1,168 @@
+"""
+Durable snapshot store for fetch results (SQLite in WAL mode).
+
+The poller saves every snapshot that changed, keeping a bounded history
+per (source, arguments). On start-up the latest rows are loaded back
+into the poller, so the first paint after a restart or deploy is served
+from disk instead of waiting on every upstream API.
+
+Time series that only need (key, time, value) rows, such as the crypto
+price history, go to a separate samples table instead of a pickled
+snapshot per refresh. They can be stored at a coarser resolution, keeping
+only the latest sample per key and time slot.
+
+A connection is opened per operation: saves only happen when data
+changes, and short-lived connections are safe across gunicorn's fork.
+"""
+
+import ast
+import os
+import pickle
+import sqlite3
+import time
+from contextlib import closing
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    source     TEXT NOT NULL,
+    args       TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    payload    BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS snapshots_key ON snapshots (source, args, fetched_at);
+CREATE TABLE IF NOT EXISTS samples (
+    series TEXT NOT NULL,
+    key    TEXT NOT NULL,
+    slot   REAL NOT NULL,
+    t      REAL NOT NULL,
+    value  REAL NOT NULL,
+    PRIMARY KEY (series, key, slot)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS samples_time ON samples (series, t);
+"""
+
+
+class SnapshotStore:
+    """Latest value plus a bounded history for every (source, args) key"""
+
+    def __init__(self, path, keep=100, keep_by_source=None):
+        self.path = path
+        self.keep = keep
+        self.keep_by_source = keep_by_source or {}
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._init_db()
+
+    def _init_db(self):
+        # Workers start together; switching to WAL can briefly hit "locked"
+        for attempt in range(20):
+            try:
+                with closing(self._connect()) as db:
+                    if db.execute("PRAGMA journal_mode").fetchone()[0] != "wal":
+                        db.execute("PRAGMA journal_mode=WAL")
+                    db.executescript(SCHEMA)
+                return
+            except sqlite3.OperationalError:
+                if attempt == 19:
+                    raise
+                time.sleep(0.1)
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=10)
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def save(self, source, args, value, fetched_at):
+        """Append a snapshot and drop the oldest rows beyond the history limit"""
+        key = repr(args)
+        keep = self.keep_by_source.get(source, self.keep)
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with closing(self._connect()) as db, db:
+            last = db.execute(
+                "SELECT payload FROM snapshots WHERE source = ? AND args = ? ORDER BY fetched_at DESC LIMIT 1",
+                (source, key),
+            ).fetchone()
+            if last is not None and last[0] == payload:
+                return  # Another worker already saved this snapshot
+            db.execute("INSERT INTO snapshots VALUES (?, ?, ?, ?)", (source, key, fetched_at, payload))
+            db.execute(
+                "DELETE FROM snapshots WHERE source = ? AND args = ? AND fetched_at <= ("
+                "  SELECT fetched_at FROM snapshots WHERE source = ? AND args = ?"
+                "  ORDER BY fetched_at DESC LIMIT 1 OFFSET ?)",
+                (source, key, source, key, keep),
+            )
+
+    def prune(self, source, before, keep=()):
+        """Delete every row of the source's keys last saved before `before`, except keys in keep.
+
+        Returns the number of keys dropped.
+        """
+        keep = {repr(args) for args in keep}
+        with closing(self._connect()) as db, db:
+            stale = [key for (key,) in db.execute(
+                "SELECT args FROM snapshots WHERE source = ? GROUP BY args HAVING MAX(fetched_at) < ?",
+                (source, before),
+            ) if key not in keep]
+            db.executemany("DELETE FROM snapshots WHERE source = ? AND args = ?", ((source, key) for key in stale))
+        return len(stale)
+
+    def latest(self):
+        """Yield (source, args, value, fetched_at) for the newest row of every key"""
+        query = (
+            "SELECT source, args, MAX(fetched_at), payload FROM snapshots GROUP BY source, args"
+        )
+        with closing(self._connect()) as db:
+            rows = db.execute(query).fetchall()
+        for source, key, fetched_at, payload in rows:
+            value = _loads(payload)
+            if value is not None:
+                yield source, _args(key), value, fetched_at
+
+    def history(self, source, args=(), since=0.0):
+        """Yield (value, fetched_at) for a key, oldest first"""
+        query = (
+            "SELECT payload, fetched_at FROM snapshots"
+            " WHERE source = ? AND args = ? AND fetched_at >= ? ORDER BY fetched_at"
+        )
+        with closing(self._connect()) as db:
+            rows = db.execute(query, (source, repr(args), since)).fetchall()
+        for payload, fetched_at in rows:
+            value = _loads(payload)
+            if value is not None:
+                yield value, fetched_at
+
+    def add_samples(self, series, rows, since=None, resolution=None):
+        """Store (key, t, value) rows and drop the series' rows older than since.
+
+        With resolution (seconds), a key keeps only its latest sample per
+        slot of that length. Rows another worker already stored are no-ops.
+        """
+        def slot(t):
+            return t // resolution * resolution if resolution else t
+
+        with closing(self._connect()) as db, db:
+            db.executemany(
+                "INSERT INTO samples VALUES (?, ?, ?, ?, ?) ON CONFLICT (series, key, slot)"
+                " DO UPDATE SET t = excluded.t, value = excluded.value WHERE excluded.t > samples.t",
+                ((series, key, slot(t), t, value) for key, t, value in rows),
+            )
+            if since is not None:
+                db.execute("DELETE FROM samples WHERE series = ? AND t < ?", (series, since))
+
+    def samples(self, series, since=0.0):
+        """Return [(key, t, value), ...] of a series, oldest first"""
+        with closing(self._connect()) as db:
+            return db.execute("SELECT key, t, value FROM samples WHERE series = ? AND t >= ? ORDER BY t",
+                              (series, since)).fetchall()
+
+
+def _loads(payload):
+    """Unpickle a row; rows written by incompatible library versions are skipped"""
+    try:
+        return pickle.loads(payload)
+    except Exception:
+        return None
+
+
+def _args(key):
+    # args are tuples of plain strings, stored with repr()
+    return ast.literal_eval(key)
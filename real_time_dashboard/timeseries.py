@@ -0,0 +1,101 @@
+"""
+In-process ring-buffer time-series store.
+
+Each series is a pair of preallocated NumPy arrays (timestamps, values)
+written as a ring, so memory per series is fixed no matter how long the
+app runs: once full, the oldest sample is overwritten. Used to keep the
+crypto tracker's price history without calling CoinGecko's market_chart
+endpoint.
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+class RingSeries:
+    """Fixed-capacity (time, value) series backed by two NumPy arrays"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.times = np.full(capacity, np.nan)
+        self.values = np.full(capacity, np.nan)
+        self._next = 0
+        self._size = 0
+
+    def append(self, t, value):
+        """Add a sample; samples not newer than the last one are ignored"""
+        if self._size and t <= self.times[self._next - 1]:
+            return False
+        self.times[self._next] = t
+        self.values[self._next] = value
+        self._next = (self._next + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+        return True
+
+    def window(self, since=None, bucket=None):
+        """(times, values) in time order, optionally only samples at or after since.
+
+        With bucket (seconds), only the last sample of each bucket is kept.
+        """
+        idx = np.arange(self._next - self._size, self._next) % self.capacity
+        times, values = self.times[idx], self.values[idx]
+        if since is not None:
+            keep = times >= since
+            times, values = times[keep], values[keep]
+        if bucket and len(times):
+            slots = times // bucket
+            keep = np.append(slots[1:] != slots[:-1], True)
+            times, values = times[keep], values[keep]
+        return times, values
+
+    def __len__(self):
+        return self._size
+
+
+class SeriesStore:
+    """Named RingSeries, all with the same capacity"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def append(self, key, t, value):
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = RingSeries(self.capacity)
+            return series.append(t, value)
+
+    def append_frame(self, df, key="id", time="last_updated", value="current_price"):
+        """Append one sample per row of a snapshot frame; returns the (key, t, value) rows added"""
+        added = []
+        times = pd.to_datetime(df[time], utc=True, errors="coerce")
+        for k, t, v in zip(df[key], times, df[value]):
+            if pd.notna(t) and pd.notna(v):
+                sample = (k, t.timestamp(), float(v))
+                if self.append(*sample):
+                    added.append(sample)
+        return added
+
+    def window(self, key, since=None, bucket=None):
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                return np.empty(0), np.empty(0)
+            return series.window(since, bucket)
+
+    def frame(self, keys, since=None, bucket=None):
+        """Long-form frame (key, time, value) of the given series"""
+        parts = []
+        for k in keys:
+            times, values = self.window(k, since, bucket)
+            parts.append(pd.DataFrame({"key": k, "time": pd.to_datetime(times, unit="s", utc=True), "value": values}))
+        if not parts:
+            return pd.DataFrame(columns=["key", "time", "value"])
+        return pd.concat(parts, ignore_index=True)
+
+    def __len__(self):
+        return len(self._series)
@@ -0,0 +1,9 @@
+"""
+WSGI entry point for production servers.
+
+    gunicorn --chdir real_time_dashboard -c real_time_dashboard/gunicorn.conf.py wsgi:server
+"""
+
+from app import app
+
+server = app.server